@@ -10,18 +10,24 @@ import os
 import sys
 import sqlite3
 import threading
+import time
 import hashlib
 import ctypes
+import subprocess
+import queue
 import webbrowser  # ★ 링크 열기용
 from ctypes import wintypes
-from pathlib import Path
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 
-from PySide6.QtCore import Qt, Signal, QTimer, QRectF
+from PySide6.QtCore import (
+    Qt, Signal, Slot, QObject, QThread, QTimer, QRectF, QAbstractTableModel, QModelIndex
+)
 from PySide6.QtGui import QColor, QBrush, QShortcut, QKeySequence, QPen
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
-    QFileDialog, QTableWidget, QTableWidgetItem, QListWidget, QListWidgetItem,
+    QFileDialog, QTableView, QListWidget, QListWidgetItem,
     QSplitter, QMessageBox, QLabel, QCheckBox, QAbstractItemView, QComboBox,
     QHeaderView, QProgressBar, QInputDialog, QMenu, QSizePolicy,
     QStyledItemDelegate, QStyleOptionViewItem, QStyle
@@ -31,6 +37,8 @@ from PySide6.QtWidgets import (
 DB_PATH = "filetags.db"
 APP_TITLE = "[상우고] Arang's 파일 태그 검색기(v.0.1.3) / 제작 : 독서하는 경호t"
 
+FILE_ROW_CHUNK = 500  # 파일 목록을 이벤트 루프에 양보하며 채우는 단위(행)
+
 # UI 치수
 BTN_H = 26        # 버튼 높이
 EDIT_H = 28       # 입력창 높이
@@ -47,6 +55,10 @@ def normalize_path(p: str) -> str:
         np = np + os.sep
     return np
 
+# MB/GB 단위 표(제수, 접미사) — bit_length 로 단위를 고른다
+_SIZE_DIV = (1048576.0, 1073741824.0)
+_SIZE_SUFFIX = ("MB", "GB")
+
 def format_size_explorer(n: int) -> str:
     """
     Windows 탐색기 유사 표기:
@@ -54,30 +66,55 @@ def format_size_explorer(n: int) -> str:
       <1GB  -> 1자리 소수 MB: '1.2MB'
       그 이상 -> 1자리 소수 GB: '3.4GB'
     """
-    if n < 1024:
+    bits = n.bit_length()
+    if bits <= 10:
         return f"{n}B"
-    kb = n / 1024.0
-    if n < 1024**2:
-        return f"{int(round(kb)):,}KB"
-    mb = kb / 1024.0
-    if n < 1024**3:
-        s = f"{mb:.1f}".rstrip("0").rstrip(".")
-        return f"{s}MB"
-    gb = mb / 1024.0
-    s = f"{gb:.1f}".rstrip("0").rstrip(".")
-    return f"{s}GB"
+    if bits <= 20:
+        return f"{round(n / 1024):,}KB"
+    i = 1 if bits > 30 else 0
+    s = f"{n / _SIZE_DIV[i]:.1f}"
+    if s[-1] == "0":  # '3.0' -> '3'
+        s = s[:-2]
+    return s + _SIZE_SUFFIX[i]
+
+def _prefix_bounds(root: str) -> tuple[str, str]:
+    """루트 하위 경로 범위 [lo, hi) 반환. path >= lo AND path < hi 로 인덱스 범위 검색.
+    lo는 구분자로 끝나게 맞춰 'D:\\a'가 'D:\\ab\\..'까지 잡지 않도록 한다."""
+    lo = normalize_path(root)
+    if not lo.endswith(os.sep):
+        lo += os.sep
+    return lo, lo[:-1] + chr(ord(lo[-1]) + 1)
 
 # =========================[ DB 연결/스키마 ]==================================
+_TLS = threading.local()  # 스레드별 연결 캐시(UI 스레드/스캔 스레드 각각 1개)
+FTS_ENABLED = False       # files_fts(FTS5 trigram) 사용 가능 여부 (init_db에서 결정)
+
 def get_conn():
-    """SQLite 연결 핸들 반환(+FK ON). 사용 후 반드시 close()."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON;")
+    """스레드별로 캐시된 SQLite 연결 반환(+FK/성능 PRAGMA). close() 하지 않고 재사용."""
+    conn = getattr(_TLS, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute("PRAGMA temp_store = MEMORY;")
+        conn.execute("PRAGMA mmap_size = 268435456;")
+        conn.execute("PRAGMA cache_size = -65536;")
+        _TLS.conn = conn
     return conn
 
+SCHEMA_VERSION = 3  # PRAGMA user_version 이 이 값이면 스키마/백필 최신 → init_db 생략
+
 def init_db():
-    """최초 실행 시 DB 테이블/인덱스 생성 + ord 필드 백필."""
+    """최초 실행 시 DB 테이블/인덱스 생성 + ord 필드 백필 + WAL 전환(한 트랜잭션)."""
+    global FTS_ENABLED
     conn = get_conn()
     cur = conn.cursor()
+    cur.execute("PRAGMA user_version;")
+    if cur.fetchone()[0] == SCHEMA_VERSION:  # FTS까지 갖춘 DB에만 기록되는 버전
+        FTS_ENABLED = True
+        return
+    cur.execute("PRAGMA journal_mode = WAL;")  # DB 파일에 영구 저장됨(트랜잭션 밖에서만 가능)
+    cur.execute("BEGIN;")
     cur.execute("""
     CREATE TABLE IF NOT EXISTS files(
         id INTEGER PRIMARY KEY,
@@ -90,7 +127,8 @@ def init_db():
     CREATE TABLE IF NOT EXISTS tags(
         id INTEGER PRIMARY KEY,
         name TEXT UNIQUE,
-        ord INTEGER
+        ord INTEGER,
+        file_count INTEGER NOT NULL DEFAULT 0
     );""")
     cur.execute("""
     CREATE TABLE IF NOT EXISTS file_tags(
@@ -113,25 +151,64 @@ def init_db():
     cur.execute("CREATE INDEX IF NOT EXISTS idx_files_path ON files(path);")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_tags_name ON tags(name);")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_file_tags_file ON file_tags(file_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_file_tags_tag_file ON file_tags(tag_id, file_id);")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_files_mtime ON files(mtime);")
-    conn.commit()
 
-    # tags.ord 채우기(초기 설치 호환)
-    cur.execute("SELECT COUNT(*) FROM tags WHERE ord IS NULL;")
-    if cur.fetchone()[0]:
-        cur.execute("SELECT id FROM tags WHERE ord IS NULL ORDER BY name;")
-        rows = cur.fetchall()
-        nxt = 1
-        for (tid,) in rows:
-            cur.execute("UPDATE tags SET ord=? WHERE id=?;", (nxt, tid)); nxt += 1
-        conn.commit()
-    conn.close()
+    # 경로 부분검색용 FTS5 trigram 미러(SQLite 3.34+). 미지원 빌드면 LIKE 검색 유지.
+    cur.execute("SAVEPOINT fts;")
+    try:
+        cur.execute("SELECT 1 FROM sqlite_master WHERE name='files_fts';")
+        had_fts = cur.fetchone() is not None
+        cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS files_fts
+        USING fts5(path, content='files', content_rowid='id', tokenize='trigram');""")
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS files_fts_ai AFTER INSERT ON files BEGIN
+            INSERT INTO files_fts(rowid, path) VALUES (new.id, new.path);
+        END;""")
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS files_fts_ad AFTER DELETE ON files BEGIN
+            INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.id, old.path);
+        END;""")
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS files_fts_au AFTER UPDATE OF path ON files BEGIN
+            INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.id, old.path);
+            INSERT INTO files_fts(rowid, path) VALUES (new.id, new.path);
+        END;""")
+        if not had_fts:  # 기존 DB 최초 1회: 이미 있는 files 내용으로 색인 채우기
+            cur.execute("INSERT INTO files_fts(files_fts) VALUES ('rebuild');")
+        FTS_ENABLED = True
+    except sqlite3.OperationalError:
+        cur.execute("ROLLBACK TO fts;")
+        FTS_ENABLED = False
+    cur.execute("RELEASE fts;")
+
+    # tags.file_count: 태그별 파일 수를 트리거로 유지(패널 갱신 때 file_tags 전체 집계 생략)
+    cur.execute("PRAGMA table_info(tags);")
+    if "file_count" not in {r[1] for r in cur.fetchall()}:
+        cur.execute("ALTER TABLE tags ADD COLUMN file_count INTEGER NOT NULL DEFAULT 0;")
+        cur.execute("UPDATE tags SET file_count=(SELECT COUNT(*) FROM file_tags WHERE tag_id=tags.id);")
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS ft_ai AFTER INSERT ON file_tags BEGIN
+        UPDATE tags SET file_count=file_count+1 WHERE id=new.tag_id;
+    END;""")
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS ft_ad AFTER DELETE ON file_tags BEGIN
+        UPDATE tags SET file_count=file_count-1 WHERE id=old.tag_id;
+    END;""")
+
+    # tags.ord 채우기(초기 설치 호환): 이름순 순번을 한 문장으로
+    cur.execute("""UPDATE tags SET ord=(SELECT 1+COUNT(*) FROM tags t2 WHERE t2.name<tags.name)
+                   WHERE ord IS NULL;""")
+    if FTS_ENABLED:  # FTS 미지원 빌드는 다음 실행 때 다시 시도하도록 버전을 남기지 않음
+        cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+    conn.commit()
 
 def get_setting(key, default=None):
     """설정값 조회 (없으면 default)."""
     conn = get_conn(); cur = conn.cursor()
     cur.execute("SELECT value FROM settings WHERE key=?;", (key,))
-    row = cur.fetchone(); conn.close()
+    row = cur.fetchone()
     return row[0] if row else default
 
 def set_setting(key, value):
@@ -140,44 +217,61 @@ def set_setting(key, value):
     cur.execute("""INSERT INTO settings(key,value) VALUES(?,?)
                    ON CONFLICT(key) DO UPDATE SET value=excluded.value;""",
                 (key, value))
-    conn.commit(); conn.close()
+    conn.commit()
 
 # =========================[ DB 조작 - 파일/태그/루트 ]========================
-def upsert_file(path: str):
-    """파일 메타(경로/크기/mtime)를 files 테이블에 UPSERT."""
-    p = Path(path)
-    if not p.is_file(): return
-    st = p.stat()
-    full = normalize_path(str(p))
+# 자주 쓰는 SQL은 상수로 고정해 연결별 prepared statement 캐시가 항상 적중하도록 한다.
+SQL_ENSURE_TAG = """
+  INSERT OR IGNORE INTO tags(name,ord)
+  VALUES(?, (SELECT COALESCE(MAX(ord),0)+1 FROM tags));"""
+SQL_TAG_ID_BY_NAME = "SELECT id FROM tags WHERE name=?;"
+SQL_LIST_FILE_TAGS = """
+  SELECT t.id, t.name
+  FROM tags t JOIN file_tags ft ON ft.tag_id=t.id
+  WHERE ft.file_id=? ORDER BY t.ord, t.name;"""
+SQL_ADD_FILE_TAG = "INSERT OR IGNORE INTO file_tags(file_id, tag_id) VALUES(?, ?);"
+SQL_DEL_FILE_TAG = "DELETE FROM file_tags WHERE file_id=? AND tag_id=?;"
+
+SCAN_BATCH = 1000  # 스캔 시 한 번에 UPSERT 할 행 수
+
+def scan_stage_begin():
+    """스캔 임시 테이블(scan_tmp) 준비. 디스크 목록을 모아 files와 한 번에 병합한다."""
+    conn = get_conn()
+    conn.execute("""CREATE TEMP TABLE IF NOT EXISTS scan_tmp(
+        path TEXT PRIMARY KEY, size INTEGER, mtime REAL);""")
+    conn.execute("DELETE FROM scan_tmp;")
+    conn.commit()
+
+def scan_stage_add(rows):
+    """스캔한 (경로, 크기, mtime) 묶음을 scan_tmp에 적재(임시 DB라 본 DB 잠금 없음)."""
+    if not rows: return
+    get_conn().executemany("INSERT OR REPLACE INTO scan_tmp(path,size,mtime) VALUES(?,?,?);", rows)
+
+def scan_stage_merge(root: str) -> int:
+    """scan_tmp → files UPSERT + 디스크에 없는 루트 하위 레코드 삭제(한 트랜잭션). 삭제 건수 반환."""
+    lo, hi = _prefix_bounds(root)
     conn = get_conn(); cur = conn.cursor()
     cur.execute("""
       INSERT INTO files(path,size,mtime,hash)
-      VALUES(?,?,?,NULL)
-      ON CONFLICT(path) DO UPDATE SET size=excluded.size, mtime=excluded.mtime;
-    """, (full, st.st_size, st.st_mtime))
-    conn.commit(); conn.close()
-
-def remove_missing_under(root: str):
-    """루트 하위에서 실제로 없는 파일을 DB에서 정리."""
-    root = normalize_path(root)
-    conn = get_conn(); cur = conn.cursor()
-    cur.execute("SELECT id, path FROM files WHERE path LIKE ?;", (f"{root}%",))
-    rows = cur.fetchall(); removed = 0
-    for fid, fpath in rows:
-        if not Path(fpath).exists():
-            cur.execute("DELETE FROM files WHERE id=?;", (fid,)); removed += 1
-    conn.commit(); conn.close(); return removed
+      SELECT path, size, mtime, NULL FROM scan_tmp WHERE true
+      ON CONFLICT(path) DO UPDATE SET size=excluded.size, mtime=excluded.mtime
+       WHERE files.size IS NOT excluded.size OR files.mtime IS NOT excluded.mtime;
+    """)
+    cur.execute("DELETE FROM files WHERE path >= ? AND path < ? "
+                "AND path NOT IN (SELECT path FROM scan_tmp);", (lo, hi))
+    removed = cur.rowcount
+    cur.execute("DELETE FROM scan_tmp;")
+    conn.commit()
+    return removed
 
 def ensure_tag(name: str):
     """태그명이 없으면 생성 후 id 반환, 있으면 해당 id 반환."""
     name = (name or "").strip()
     if not name: return None
     conn = get_conn(); cur = conn.cursor()
-    cur.execute("SELECT COALESCE(MAX(ord),0)+1 FROM tags;")
-    nxt = cur.fetchone()[0]
-    cur.execute("INSERT OR IGNORE INTO tags(name,ord) VALUES(?,?);", (name, nxt))
-    cur.execute("SELECT id FROM tags WHERE name=?;", (name,))
-    row = cur.fetchone(); conn.commit(); conn.close()
+    cur.execute(SQL_ENSURE_TAG, (name,))
+    cur.execute(SQL_TAG_ID_BY_NAME, (name,))
+    row = cur.fetchone(); conn.commit()
     return row[0] if row else None
 
 def delete_tags(tag_ids):
@@ -185,22 +279,19 @@ def delete_tags(tag_ids):
     if not tag_ids: return
     conn = get_conn(); cur = conn.cursor()
     cur.executemany("DELETE FROM tags WHERE id=?;", [(tid,) for tid in tag_ids])
-    conn.commit(); conn.close()
+    conn.commit()
 
 def list_tags():
     """(id, name, ord) 리스트를 순서대로 반환."""
     conn = get_conn(); cur = conn.cursor()
     cur.execute("SELECT id, name, ord FROM tags ORDER BY ord ASC, name ASC;")
-    rows = cur.fetchall(); conn.close(); return rows
+    return cur.fetchall()
 
 def list_file_tags(file_id: int):
     """특정 파일에 걸린 태그 (id, name) 리스트 반환."""
     conn = get_conn(); cur = conn.cursor()
-    cur.execute("""
-      SELECT t.id, t.name
-      FROM tags t JOIN file_tags ft ON ft.tag_id=t.id
-      WHERE ft.file_id=? ORDER BY t.ord, t.name;""", (file_id,))
-    rows = cur.fetchall(); conn.close(); return rows
+    cur.execute(SQL_LIST_FILE_TAGS, (file_id,))
+    return cur.fetchall()
 
 def add_root(path: str):
     """색인 루트 경로 추가/업데이트."""
@@ -208,133 +299,194 @@ def add_root(path: str):
     conn = get_conn(); cur = conn.cursor()
     cur.execute("""INSERT INTO roots(path,last_scanned) VALUES(?,strftime('%s','now'))
                    ON CONFLICT(path) DO UPDATE SET last_scanned=strftime('%s','now');""", (path,))
-    conn.commit(); conn.close()
+    conn.commit()
 
 def list_roots():
     """등록된 루트 경로 리스트(정규화) 반환."""
     conn = get_conn(); cur = conn.cursor()
     cur.execute("SELECT path FROM roots ORDER BY path;")
-    rows = [normalize_path(r[0]) for r in cur.fetchall()]
-    conn.close(); return rows
+    return [normalize_path(r[0]) for r in cur.fetchall()]
 
 def remove_root(path: str):
     """루트 경로 제거 + 하위 파일 레코드 삭제."""
     path = normalize_path(path)
     conn = get_conn(); cur = conn.cursor()
     cur.execute("DELETE FROM roots WHERE path=?;", (path,))
-    cur.execute("DELETE FROM files WHERE path LIKE ?;", (f"{path}%",))
-    conn.commit(); conn.close()
+    cur.execute("DELETE FROM files WHERE path >= ? AND path < ?;", _prefix_bounds(path))
+    conn.commit()
 
 # =========================[ 조회용 쿼리 ]=====================================
 def count_files_under(root: str) -> int:
-    """해당 루트 하위 files 개수를 LIKE로 카운트."""
-    root = normalize_path(root)
-    esc = root.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+    """해당 루트 하위 files 개수(인덱스 범위 검색)."""
     conn = get_conn(); cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM files WHERE path LIKE ? ESCAPE '\\';", (f"{esc}%",))
+    cur.execute("SELECT COUNT(*) FROM files WHERE path >= ? AND path < ?;", _prefix_bounds(root))
     n = cur.fetchone()[0]
-    conn.close(); return n
+    return n
 
 def build_query(tag_ids, search_text, only_tagged):
-    """파일 목록 조회용 동적 JOIN/WHERE 구성."""
+    """파일 목록 조회용 동적 JOIN/WHERE 구성.
+    선택 태그(AND)는 태그 수만큼 self-JOIN 하지 않고 (tag_id,file_id) 인덱스를
+    IN 으로 한 번 훑은 뒤 HAVING COUNT(DISTINCT)=k 로 거른다."""
     params, where, joins = [], [], []
-    if search_text:
-        where.append("f.path LIKE ?"); params.append(f"%{search_text}%")
-    if only_tagged:
-        where.append("EXISTS (SELECT 1 FROM file_tags x WHERE x.file_id=f.id)")
     if tag_ids:
-        for i, tid in enumerate(tag_ids):
-            alias = f"ft{i}"
-            joins.append(f"JOIN file_tags {alias} ON {alias}.file_id=f.id AND {alias}.tag_id=?")
-            params.insert(0, tid)
+        tag_ids = list(dict.fromkeys(tag_ids))
+        ph = ",".join("?" * len(tag_ids))
+        joins.append(f"JOIN (SELECT file_id FROM file_tags WHERE tag_id IN ({ph}) "
+                     f"GROUP BY file_id HAVING COUNT(DISTINCT tag_id)={len(tag_ids)}) sel "
+                     "ON sel.file_id=f.id")
+        params.extend(tag_ids)
+    elif only_tagged:  # 태그 조건이 있으면 이미 '태그 있는 파일'로 한정되므로 생략
+        joins.append("JOIN (SELECT DISTINCT file_id FROM file_tags) tagged ON tagged.file_id=f.id")
+    if search_text:
+        if FTS_ENABLED and len(search_text) >= 3:  # trigram은 3글자 이상부터 색인 사용
+            where.append("f.id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH ?)")
+            params.append('"' + search_text.replace('"', '""') + '"')
+        else:
+            where.append("f.path LIKE ?"); params.append(f"%{search_text}%")
     return " ".join(joins), (" WHERE " + " AND ".join(where)) if where else "", params
 
-def list_files(search_text, tag_ids, only_tagged, root_prefix=None):
-    """필터(검색어/태그/루트)로 files 목록 반환."""
+FETCH_BATCH = 1000  # fetchmany 단위(행)
+
+def _filter_sql(search_text, tag_ids, only_tagged, root_prefix):
+    """build_query 결과에 루트 범위 조건까지 붙인 (join, where, params)."""
     join_sql, where_sql, params = build_query(tag_ids or [], search_text, only_tagged)
     if root_prefix:
-        root_prefix = normalize_path(root_prefix)
-        where_sql += (" AND " if where_sql else " WHERE ") + "f.path LIKE ?"
-        params.append(f"{root_prefix}%")
-    sql_order = " ORDER BY f.path ASC "
+        where_sql += (" AND " if where_sql else " WHERE ") + "f.path >= ? AND f.path < ?"
+        params.extend(_prefix_bounds(root_prefix))
+    return join_sql, where_sql, params
+
+def iter_files(search_text, tag_ids, only_tagged, root_prefix=None):
+    """필터(검색어/태그/루트)로 files 행을 FETCH_BATCH 단위로 읽어 내놓는 제너레이터.
+    행: (id, path, size, mtime, tags, mtime_str) — mtime_str 은 SQLite 가 로컬시각으로 포맷.
+    순서는 목록 기본 정렬(수정일 내림차순, 같으면 경로순)과 같아 UI 에서 다시 정렬할 필요 없음."""
+    join_sql, where_sql, params = _filter_sql(search_text, tag_ids, only_tagged, root_prefix)
+    sql_order = " ORDER BY f.mtime DESC, f.path ASC "
     sql = f"""
     SELECT f.id, f.path, f.size, f.mtime,
-           (SELECT GROUP_CONCAT(t.name, ', ')
-              FROM tags t JOIN file_tags ft ON ft.tag_id=t.id
-             WHERE ft.file_id=f.id) AS tags
+           GROUP_CONCAT(t.name, ', ') AS tags,
+           strftime('%Y-%m-%d %H:%M:%S', CAST(f.mtime AS INTEGER), 'unixepoch', 'localtime') AS mtime_str
       FROM files f
       {join_sql}
+      LEFT JOIN file_tags ft ON ft.file_id=f.id
+      LEFT JOIN tags t ON t.id=ft.tag_id
       {where_sql}
+     GROUP BY f.id
       {sql_order};"""
     conn = get_conn(); cur = conn.cursor()
-    cur.execute(sql, params); rows = cur.fetchall(); conn.close()
-    return rows
+    cur.arraysize = FETCH_BATCH
+    cur.execute(sql, params)
+    while rows := cur.fetchmany():
+        yield from rows
+
+def list_files(search_text, tag_ids, only_tagged, root_prefix=None):
+    """필터(검색어/태그/루트)로 files 목록 반환."""
+    return list(iter_files(search_text, tag_ids, only_tagged, root_prefix))
 
 def count_all_files():
     """전체 files 개수 반환."""
     conn = get_conn(); cur = conn.cursor()
     cur.execute("SELECT COUNT(*) FROM files;")
     n = cur.fetchone()[0]
-    conn.close(); return n
+    return n
 
 def count_files_by_tag() -> dict[int, int]:
-    """태그별 파일 개수 딕셔너리 {tag_id: count}."""
+    """태그별 파일 개수 딕셔너리 {tag_id: count}. (트리거로 유지되는 tags.file_count)"""
     conn = get_conn(); cur = conn.cursor()
-    cur.execute("""
-        SELECT t.id, COALESCE(COUNT(ft.file_id),0) AS cnt
-          FROM tags t
-          LEFT JOIN file_tags ft ON ft.tag_id=t.id
-         GROUP BY t.id
-         ORDER BY t.ord, t.name;
-    """)
-    rows = cur.fetchall(); conn.close()
-    return {tid: cnt for tid, cnt in rows}
+    cur.execute("SELECT id, file_count FROM tags;")
+    return dict(cur.fetchall())
 
 # =========================[ 파일 시스템 유틸 ]================================
-def count_files_on_disk(root: str) -> int:
-    """디스크에서 루트 하위 파일 개수 빠른 카운트(os.walk)."""
-    root = normalize_path(root)
-    c = 0
-    for _dp, _dirs, files in os.walk(root):
-        c += len(files)
-    return c
+PROGRESS_INTERVAL = 0.1  # 스캔 진행 시그널 최소 간격(초) — GUI 이벤트 큐 폭주 방지
+SCAN_WORKERS = 16  # 디렉터리 단위 병렬 scandir/stat 스레드 수(네트워크 드라이브 지연 은닉용)
+
+def scan_files_parallel(root: str, max_workers: int = SCAN_WORKERS):
+    """루트 하위 파일을 디렉터리 단위로 스레드 풀에서 scandir+stat 하여
+    [(정규화 경로, size, mtime), ...] 묶음(최대 SCAN_BATCH개)을 호출 스레드로 yield.
+    DB 쓰기는 호출 스레드 하나에서만 하도록 결과는 큐로만 넘긴다."""
+    q: queue.Queue = queue.Queue()
+    lock = threading.Lock()
+    pending = 1  # 아직 끝나지 않은 디렉터리 작업 수
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def visit(d):
+        nonlocal pending
+        out = []
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            with lock:
+                                pending += 1
+                            try:
+                                pool.submit(visit, e.path)
+                            except RuntimeError:  # 소비자가 중단해 풀이 닫힘
+                                return
+                        elif not e.is_dir():  # os.walk 와 동일하게 폴더 링크는 파일로 치지 않음
+                            st = e.stat()
+                            out.append((normalize_path(e.path), st.st_size, st.st_mtime))
+                            if len(out) >= SCAN_BATCH:
+                                q.put(out); out = []
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        finally:
+            if out:
+                q.put(out)
+            with lock:
+                pending -= 1
+                last = pending == 0
+            if last:
+                q.put(None)  # 종료 신호
+
+    pool.submit(visit, root)
+    try:
+        while (chunk := q.get()) is not None:
+            yield chunk
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 def walk_count_and_max_mtime(root: str) -> tuple[int, float]:
-    """디스크에서 (파일개수, 최대 mtime) 계산."""
+    """디스크에서 (파일개수, 최대 mtime) 계산. stat은 scan_files_parallel 로 병렬 수행."""
     root = normalize_path(root)
     total = 0
     max_m = 0.0
-    for dp, _dirs, files in os.walk(root):
-        for fn in files:
-            total += 1
-            try:
-                mt = os.path.getmtime(os.path.join(dp, fn))
-                if mt > max_m:
-                    max_m = mt
-            except Exception:
-                pass
+    for chunk in scan_files_parallel(root):
+        total += len(chunk)
+        mt = max(r[2] for r in chunk)
+        if mt > max_m:
+            max_m = mt
     return total, max_m
 
 def db_count_and_max_mtime_under(root: str) -> tuple[int, float]:
     """DB에서 (파일개수, 최대 mtime) 조회."""
-    root = normalize_path(root)
     conn = get_conn(); cur = conn.cursor()
-    cur.execute("SELECT COUNT(*), COALESCE(MAX(mtime),0) FROM files WHERE path LIKE ?;", (f"{root}%",))
+    cur.execute("SELECT COUNT(*), COALESCE(MAX(mtime),0) FROM files WHERE path >= ? AND path < ?;",
+                _prefix_bounds(root))
     n, mx = cur.fetchone()
-    conn.close()
     return int(n or 0), float(mx or 0.0)
 
 def show_in_explorer(path: str):
-    """OS 탐색기에서 파일/폴더 열기."""
-    if sys.platform.startswith("win"):
-        os.system(f'explorer /select,"{path}"')
-    elif sys.platform == "darwin":
-        os.system(f'open -R "{path}"')
-    else:
-        os.system(f'xdg-open "{os.path.dirname(path)}"')
-
-def recycle_delete(path: str) -> bool:
-    """Windows: 휴지통으로 / 그외 OS: 영구 삭제. 성공시 True."""
+    """OS 탐색기에서 파일/폴더 열기(셸/cmd.exe 를 거치지 않음)."""
+    try:
+        if sys.platform.startswith("win"):
+            # ShellExecuteW 반환값 > 32 이면 성공
+            if ctypes.windll.shell32.ShellExecuteW(None, "open", "explorer.exe",
+                                                   f'/select,"{path}"', None, 1) > 32:
+                return
+            subprocess.Popen(["explorer", f"/select,{path}"])
+        elif sys.platform == "darwin":
+            subprocess.Popen(["open", "-R", path])
+        else:
+            subprocess.Popen(["xdg-open", os.path.dirname(path)])
+    except OSError:
+        pass
+
+def recycle_delete_many(paths: list[str]) -> bool:
+    """Windows: 휴지통으로(SHFileOperation 1회) / 그외 OS: 영구 삭제. 모두 성공시 True."""
+    if not paths:
+        return True
     try:
         if sys.platform.startswith("win"):
             class SHFILEOPSTRUCT(ctypes.Structure):
@@ -349,30 +501,35 @@ def recycle_delete(path: str) -> bool:
             FOF_NOCONFIRMATION = 0x0010
             FOF_SILENT = 0x0004
             shell = ctypes.windll.shell32
-            pFrom = normalize_path(path) + '\0\0'
+            pFrom = '\0'.join(normalize_path(p) for p in paths) + '\0\0'
             op = SHFILEOPSTRUCT(0, FO_DELETE, pFrom, None,
                                 FOF_ALLOWUNDO | FOF_NOCONFIRMATION | FOF_SILENT,
                                 False, None, None)
             res = shell.SHFileOperationW(ctypes.byref(op))
             return res == 0 and not op.fAnyOperationsAborted
         else:
-            os.remove(path)
-            return True
+            ok = True
+            for p in paths:
+                try:
+                    os.remove(p)
+                except OSError:
+                    ok = False
+            return ok
     except Exception:
         return False
 
-def db_delete_file_by_path(path: str):
-    """files 테이블에서 해당 경로 레코드 삭제."""
+def db_delete_files_by_paths(paths: list[str]):
+    """files 테이블에서 여러 경로 레코드를 한 트랜잭션으로 삭제."""
     conn = get_conn(); cur = conn.cursor()
-    cur.execute("DELETE FROM files WHERE path=?;", (normalize_path(path),))
-    conn.commit(); conn.close()
+    cur.executemany("DELETE FROM files WHERE path=?;", [(normalize_path(p),) for p in paths])
+    conn.commit()
 
 def db_rename_file_path(old_path: str, new_path: str):
     """files 테이블의 경로 필드 갱신."""
     conn = get_conn(); cur = conn.cursor()
     cur.execute("UPDATE files SET path=? WHERE path=?;",
                 (normalize_path(new_path), normalize_path(old_path)))
-    conn.commit(); conn.close()
+    conn.commit()
 
 # =========================[ 색상/테마 유틸 ]=================================
 PALETTE = [
@@ -382,40 +539,56 @@ PALETTE = [
     QColor(255,240,200), QColor(220,245,255), QColor(220,255,240), QColor(245,220,255)
 ]
 
+# 반환 QColor는 PALETTE 공유 객체(읽기 전용) → 캐시해도 안전. 페인트마다 SHA-1 재계산 방지.
+@lru_cache(maxsize=2048)
 def color_for_tag(tid: int, name: str) -> QColor:
     """태그 id/이름을 안정적인 파스텔색으로 매핑."""
     if tid is not None: return PALETTE[tid % len(PALETTE)]
     h = int(hashlib.sha1((name or '').encode()).hexdigest()[:2], 16)
     return PALETTE[h % len(PALETTE)]
 
+@lru_cache(maxsize=2048)
 def color_for_root_path(path: str) -> QColor:
     """루트 경로별 파스텔색(해시 기반)."""
     h = int(hashlib.sha1((normalize_path(path) or '').encode()).hexdigest()[:2], 16)
     return PALETTE[h % len(PALETTE)]
 
+_BRUSH_CACHE: dict[int, QBrush] = {}  # rgba → QBrush (팔레트 크기만큼만 생김)
+
+def brush_for(col: QColor) -> QBrush:
+    """색별로 공유하는 QBrush 반환(목록 갱신마다 QBrush 새로 만들지 않음)."""
+    key = col.rgba()
+    br = _BRUSH_CACHE.get(key)
+    if br is None:
+        br = _BRUSH_CACHE[key] = QBrush(col)
+    return br
+
 # =========================[ 태그 칩 렌더러 ]=================================
+TAG_CHIPS_ROLE = Qt.UserRole + 1  # 태그열 아이템에 (태그들, 색들) 을 미리 달아두는 role
+
 class TagChipsDelegate(QStyledItemDelegate):
     """태그 문자열(쉼표 구분)을 칩(버튼)처럼 그려주는 델리게이트 (4열 전용)."""
 
-    def __init__(self, color_resolver, parent=None):
+    def __init__(self, color_map: dict[str, QColor], fallback=None, parent=None):
         super().__init__(parent)
-        self._color_resolver = color_resolver
-
-    def _chip_color(self, name: str) -> QColor:
-        try:
-            col = self._color_resolver(name)
-            if isinstance(col, QColor):
-                return col
-        except Exception:
-            pass
-        return color_for_tag(None, name)
+        self._color_map = color_map  # MainUI의 dict를 그대로 참조(복사 X)
+        self._fallback = fallback or (lambda name: color_for_tag(None, name))
+        self._adv_cache: dict[str, int] = {}  # 태그 문자열 → 텍스트 폭(px). 폰트가 바뀌면 비움
+        self._adv_font_key = None
 
     def paint(self, painter, option, index):
         if index.column() != 3:
             return super().paint(painter, option, index)
 
-        text = index.data(Qt.DisplayRole) or ""
-        tags = [t.strip() for t in text.split(",") if t.strip()]
+        chips = index.data(TAG_CHIPS_ROLE)
+        if chips:  # 모델이 행마다 한 번 계산해 둔 (tags, colors)
+            tags, colors = chips
+        else:
+            text = index.data(Qt.DisplayRole) or ""
+            tags = [t.strip() for t in text.split(",") if t.strip()]
+            color_get = self._color_map.get
+            fallback = self._fallback
+            colors = [color_get(t) or fallback(t) for t in tags]
 
         opt = QStyleOptionViewItem(option)
         self.initStyleOption(opt, index)
@@ -429,9 +602,16 @@ class TagChipsDelegate(QStyledItemDelegate):
 
         painter.save()
         fm = opt.fontMetrics
+        font_key = opt.font.key()
+        if font_key != self._adv_font_key:
+            self._adv_cache.clear()
+            self._adv_font_key = font_key
+        adv = self._adv_cache
         x = opt.rect.x() + 6
         y_center = opt.rect.y() + opt.rect.height() // 2
         pad_h, pad_v = 8, 4
+        pad_w = pad_h * 2
+        chip_h = fm.height() + pad_v * 2
         spacing = 6
         max_x = opt.rect.right() - 6
         hidden = 0
@@ -440,14 +620,15 @@ class TagChipsDelegate(QStyledItemDelegate):
         pen.setWidth(2)
         painter.setPen(pen)
 
-        for t in tags:
-            chip_w = fm.horizontalAdvance(t) + pad_h * 2
-            chip_h = fm.height() + pad_v * 2
+        for t, bg in zip(tags, colors):
+            text_w = adv.get(t)
+            if text_w is None:
+                text_w = adv[t] = fm.horizontalAdvance(t)
+            chip_w = text_w + pad_w
             if x + chip_w > max_x:
                 hidden += 1
                 break
             rect = QRectF(x, y_center - chip_h / 2, chip_w, chip_h)
-            bg = self._chip_color(t)
             painter.setBrush(bg)
             painter.drawRoundedRect(rect, 10, 10)
             painter.drawText(rect, Qt.AlignCenter, t)
@@ -455,8 +636,7 @@ class TagChipsDelegate(QStyledItemDelegate):
 
         if hidden > 0:
             more = f"+{hidden}"
-            chip_w = fm.horizontalAdvance(more) + pad_h * 2
-            chip_h = fm.height() + pad_v * 2
+            chip_w = fm.horizontalAdvance(more) + pad_w
             if x + chip_w <= max_x:
                 rect = QRectF(x, y_center - chip_h / 2, chip_w, chip_h)
                 painter.setBrush(QColor(229, 231, 235))
@@ -465,12 +645,293 @@ class TagChipsDelegate(QStyledItemDelegate):
 
         painter.restore()
 
+# =========================[ 파일 목록 모델 ]=================================
+FILE_HEADERS = ["파일", "크기", "수정시각", "태그", "위치", "ID"]
+_ALIGN_RIGHT = Qt.AlignRight | Qt.AlignVCenter
+
+class FileTableModel(QAbstractTableModel):
+    """파일 목록을 열별 리스트(SoA)로 들고 있는 모델. 표시 문자열은 채울 때 한 번에 만들어 두고
+    data() 는 리스트 인덱싱만 한다(QTableWidgetItem/셀별 QBrush 없음)."""
+
+    def __init__(self, color_map: dict[str, QColor], parent=None):
+        super().__init__(parent)
+        self._color_map = color_map  # MainUI의 dict를 그대로 참조(복사 X)
+        self._clear()
+
+    def _clear(self):
+        # 원시값 열
+        self._ids: list[int] = []
+        self._paths: list[str] = []
+        self._sizes: list[int] = []
+        self._mtimes: list[float] = []
+        # 표시 문자열 열 (0~5열 순서)
+        self._fnames: list[str] = []
+        self._size_strs: list[str] = []
+        self._mtime_strs: list[str] = []
+        self._tags: list[str] = []
+        self._dirs: list[str] = []
+        self._id_strs: list[str] = []
+        # 태그 칩 (태그들, 색들) / 파일명 칸 배경(첫 태그 색) — 태그 없으면 None
+        self._chips: list = []
+        self._row_bg: list = []
+        self._cols = (self._fnames, self._size_strs, self._mtime_strs,
+                      self._tags, self._dirs, self._id_strs)
+        self._sort_keys = (self._fnames, self._sizes, self._mtimes,
+                           self._tags, self._dirs, self._ids)
+
+    def _all_columns(self):
+        return (self._ids, self._paths, self._sizes, self._mtimes) + self._cols + (self._chips, self._row_bg)
+
+    def _extend(self, rows: list):
+        """list_files 행 (id, path, size, mtime, tags, mtime_str) 묶음을 열별로 풀어 붙인다."""
+        ids, paths, sizes, mtimes, tags, mtime_strs = zip(*rows)
+        # 같은 문자열(태그/날짜/크기/폴더)은 sys.intern 으로 한 객체만 공유, 칩도 태그 문자열별로 1개
+        intern = sys.intern
+        tags = [intern(t) if t else "" for t in tags]
+        get = self._color_map.get
+        chip_by_tags = {"": None}
+        chips = []
+        for t in tags:
+            if t not in chip_by_tags:
+                names = tuple(n.strip() for n in t.split(",") if n.strip())
+                chip_by_tags[t] = (names, tuple(get(n) or color_for_tag(None, n) for n in names)) if names else None
+            chips.append(chip_by_tags[t])
+        self._ids.extend(ids)
+        self._paths.extend(paths)
+        self._sizes.extend(sizes)
+        self._mtimes.extend(mtimes)
+        # basename/dirname 대신 rpartition 1회. 드라이브/루트 바로 아래면 구분자를 남김('C:\\', '/')
+        sep = os.sep
+        splits = [p.rpartition(sep) for p in paths]
+        self._fnames.extend([sp[2] for sp in splits])
+        self._size_strs.extend([intern(format_size_explorer(n)) for n in sizes])  # ★ 탐색기 스타일
+        self._mtime_strs.extend([intern(m) if m else "" for m in mtime_strs])  # SQL strftime(localtime)으로 이미 포맷됨
+        self._tags.extend(tags)
+        self._dirs.extend([intern(sp[0] if sp[0] and sp[0][-1] != ":" else sp[0] + sp[1]) for sp in splits])
+        self._id_strs.extend([str(i) for i in ids])
+        self._chips.extend(chips)
+        self._row_bg.extend([brush_for(c[1][0]) if c else None for c in chips])
+
+    def set_rows(self, rows):
+        """행 전체 교체(모델 리셋 1회). 비어 있는데 또 비우는 경우는 아무것도 안 함."""
+        rows = list(rows)
+        if not rows and not self._ids:
+            return
+        self.beginResetModel()
+        self._clear()
+        if rows:
+            self._extend(rows)
+        self.endResetModel()
+
+    def append_rows(self, rows: list):
+        """행 묶음을 끝에 추가(청크 단위 채우기용)."""
+        n = len(self._ids)
+        self.beginInsertRows(QModelIndex(), n, n + len(rows) - 1)
+        self._extend(rows)
+        self.endInsertRows()
+
+    def file_id(self, row: int) -> int:
+        return self._ids[row]
+
+    def path(self, row: int) -> str:
+        return self._paths[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(FILE_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return FILE_HEADERS[section] if orientation == Qt.Horizontal else section + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r = index.row(); col = index.column()
+        if role == Qt.DisplayRole:
+            return self._cols[col][r]
+        if col == 0:
+            if role == Qt.UserRole:
+                return self._paths[r]
+            if role == Qt.BackgroundRole:  # 첫 태그 색으로 파일명 칸 배경
+                return self._row_bg[r]
+            if role == Qt.ToolTipRole:
+                return self._paths[r]
+        elif col == 3:
+            if role == TAG_CHIPS_ROLE:
+                return self._chips[r]
+        elif col == 1:
+            if role == Qt.TextAlignmentRole:
+                return _ALIGN_RIGHT
+        elif col == 4:
+            if role == Qt.ToolTipRole:
+                return self._paths[r]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """원시값 열(크기/mtime/id 등) 기준 정렬 후 모든 열을 같은 순서로 재배치.
+        선택 등 persistent index 는 새 위치로 옮긴다."""
+        if not 0 <= column < len(self._sort_keys):
+            return
+        n = len(self._ids)
+        self.layoutAboutToBeChanged.emit()
+        perm = sorted(range(n), key=self._sort_keys[column].__getitem__,
+                      reverse=(order == Qt.DescendingOrder))
+        for col in self._all_columns():
+            col[:] = [col[i] for i in perm]
+        new_pos = [0] * n
+        for new, old in enumerate(perm):
+            new_pos[old] = new
+        old_idx = self.persistentIndexList()
+        self.changePersistentIndexList(
+            old_idx, [self.index(new_pos[i.row()], i.column()) for i in old_idx])
+        self.layoutChanged.emit()
+
+# =========================[ 스타일 시트 ]===================================
+# 앱 전체에 한 번만 적용(main 에서 QApplication.setStyleSheet) → Qt가 한 번만 파싱
+_STYLESHEET = """
+    QWidget {
+        background: #F3F4F6;
+        color: #111827;
+        font-size: 12pt;
+        font-weight: 800;
+    }
+    QLineEdit, QComboBox, QListWidget, QTableView {
+        background: #FFFFFF;
+        color: #111827;
+        border: 1px solid #000000;
+        border-radius: 10px;
+        font-weight: 800;
+    }
+    QLineEdit:focus, QComboBox:focus {
+        border: 2px solid #000000;
+        background: #FFFFFF;
+    }
+    #fileTable { font-size: 10pt; border-radius: 10px; gridline-color: #FFFFFF; }
+    QHeaderView::section {
+        background: #111827;
+        color: #ffffff;
+        padding-top: 2px; padding-bottom: 2px; padding-left: 8px; padding-right: 8px;
+        border: 0;
+        font-weight: 900;
+        font-size: 12pt;
+        border-right: 1px solid #FFFFFF10;
+    }
+    QHeaderView::section:last { border-right: 0; }
+
+    QTableView { alternate-background-color: #F7F7F8; }
+    QTableView::item:selected, QListWidget::item:selected {
+        background: #FDE68A;
+        color: #111111;
+    }
+
+    QHeaderView#fileTableH::section {
+        background: #111827; color: #ffffff;
+        padding-top: 2px; padding-bottom: 2px; padding-left: 8px; padding-right: 8px;
+        border: 0;
+        border-right: 2px solid #F59E0B;
+    }
+    QHeaderView#fileTableH::section:last { border-right: 0; }
+    QHeaderView#fileTableV::section {
+        background: #111827; color: #ffffff;
+        padding-top: 2px; padding-bottom: 2px; padding-left: 6px; padding-right: 6px;
+        border: 0;
+        border-bottom: 1px solid #F59E0B;
+    }
+    QTableCornerButton::section {
+        background: #111827; border: 0;
+        border-right: 2px solid #F59E0B;
+        border-bottom: 1px solid #F59E0B;
+    }
+
+    QPushButton {
+        background: #E5E7EB;
+        border: 2px solid #000000;
+        padding: 2px 8px;
+        border-radius: 10px;
+        font-size: 12pt;
+        font-weight: 800;
+    }
+    QPushButton:hover { background: #D1D5DB; }
+    QPushButton:disabled { background: #E5E7EB; color: #9CA3AF; border-color: #000000; }
+
+    QPushButton#primaryBtn {
+        background: #2563EB;
+        color: #FFFFFF;
+        border: 2px solid #000000;
+        padding: 2px 8px;
+    }
+    QPushButton#primaryBtn:hover {
+        background: #1D4ED8;
+        border: 2px solid #000000;
+    }
+
+    QCheckBox { font-size: 12pt; font-weight: 800; }
+    QCheckBox::indicator {
+        width: 18px; height: 18px;
+        border: 2px solid #000000; background: #FFFFFF; border-radius: 4px;
+    }
+    QCheckBox::indicator:checked {
+        background: #DC2626; border: 2px solid #000000;
+    }
+    QCheckBox::indicator:unchecked:hover { background: #FEE2E2; }
+
+    QProgressBar { border: 2px solid #000000; border-radius: 6px; height: 10px; text-align: center; }
+    QProgressBar::chunk { background: #2563EB; border-radius: 6px; }
+
+    QScrollBar:vertical { background: #202124; width: 16px; margin: 0px; }
+    QScrollBar::handle:vertical { background: #3D3D3D; border-radius: 6px; min-height: 32px; }
+    QScrollBar::handle:vertical:hover { background: #505050; }
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0; }
+
+    QScrollBar:horizontal { background: #202124; height: 16px; margin: 0px; }
+    QScrollBar::handle:horizontal { background: #3D3D3D; border-radius: 6px; min-width: 32px; }
+    QScrollBar::handle:horizontal:hover { background: #505050; }
+    QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width: 0; }
+
+    /* 마우스 호버 시 빨간 배경 + 흰 글자 */
+    QTableView#fileTable::item:hover { background: #DC2626; color: #FFFFFF; }
+    QTableView#fileTable::item:selected:hover { background: #DC2626; color: #FFFFFF; }
+    """
+
+# =========================[ 스캔 워커(QThread) ]=============================
+class ScanWorker(QObject):
+    """스캔 전용 QThread 에 상주하며 루트들을 차례로 색인. 스캔마다 스레드를 새로 만들지 않는다."""
+    tick = Signal(int, int)  # (processed, total) — total 0 이면 전체 개수 미정
+    finished = Signal()
+
+    @Slot(list, int)
+    def run(self, roots: list, total: int):
+        processed = 0
+        last_emit = time.monotonic()
+        me = QThread.currentThread()
+        try:
+            for root in roots:
+                add_root(root)
+                scan_stage_begin()
+                for chunk in scan_files_parallel(root):  # stat은 풀에서, DB 쓰기는 이 스레드만
+                    if me.isInterruptionRequested():  # 앱 종료 중
+                        return
+                    scan_stage_add(chunk)
+                    processed += len(chunk)
+                    now = time.monotonic()
+                    if now - last_emit >= PROGRESS_INTERVAL:
+                        self.tick.emit(min(processed, total) if total else processed, total)
+                        last_emit = now
+                scan_stage_merge(root)  # UPSERT + 누락 파일 정리를 한 번에
+        finally:
+            self.finished.emit()
+
 # =========================[ 메인 UI ]========================================
 class MainUI(QWidget):
     """메인 애플리케이션 위젯."""
     progress_tick = Signal(int, int)
     scan_started  = Signal(int)
     scan_finished = Signal()
+    scan_requested = Signal(list, int)  # (roots, total) → ScanWorker.run (스캔 스레드에서 실행)
 
     def __init__(self):
         super().__init__()
@@ -483,6 +944,15 @@ class MainUI(QWidget):
         self.selected_tag_ids = set()
         self.scan_running = False
         self.tag_color_by_name = {}
+        self._pending_rows = None  # 채우는 중인 파일 목록 이터레이터(refresh_files)
+        self._row_by_rootpath: dict = {None: 0}  # 루트 경로 → root_list 행 (refresh_roots_panel)
+        self._row_by_tagid: dict = {None: 0}     # 태그 id → tag_list 행 (refresh_tags)
+
+        # 연달아 들어오는 refresh_all_counts 요청을 한 번으로 합침(50ms)
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(50)
+        self._refresh_timer.timeout.connect(self._do_refresh_all_counts)
 
         # ---------- 상단 영역 ----------
         top = QVBoxLayout()
@@ -649,9 +1119,10 @@ class MainUI(QWidget):
         left.setMinimumWidth(190)
 
         # ---------- 중앙(파일 테이블) ----------
-        self.table = QTableWidget(0, 6)
+        self.table = QTableView()
         self.table.setObjectName("fileTable")
-        self.table.setHorizontalHeaderLabels(["파일", "크기", "수정시각", "태그", "위치", "ID"])
+        self.file_model = FileTableModel(self.tag_color_by_name, self)
+        self.table.setModel(self.file_model)
         self.table.setColumnHidden(5, True)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
@@ -670,10 +1141,7 @@ class MainUI(QWidget):
         self.table.setMouseTracking(True)
 
         # 태그 칩 렌더러(4번째 열)
-        self.tag_delegate = TagChipsDelegate(
-            lambda name: self.tag_color_by_name.get(name, color_for_tag(None, name)),
-            self.table
-        )
+        self.tag_delegate = TagChipsDelegate(self.tag_color_by_name, parent=self.table)
         self.table.setItemDelegateForColumn(3, self.tag_delegate)
 
         # 헤더 objectName 부여(스타일 구분)
@@ -708,7 +1176,15 @@ class MainUI(QWidget):
         self.table.verticalHeader().setDefaultSectionSize(29)
         self.table.horizontalHeader().setFixedHeight(31)
 
-        self.apply_styles()  # 스타일 시트 적용
+        # ---------- 스캔 스레드(1개 상주, 스캔마다 재사용) ----------
+        self._scan_thread = QThread(self)
+        self._scan_worker = ScanWorker()
+        self._scan_worker.moveToThread(self._scan_thread)
+        self.scan_requested.connect(self._scan_worker.run)
+        self._scan_worker.tick.connect(self.progress_tick)
+        self._scan_worker.finished.connect(self.scan_finished)
+        self._scan_thread.start()
+        QApplication.instance().aboutToQuit.connect(self._stop_scan_thread)
 
         # ---------- 시그널 바인딩 ----------
         self.btn_pick.clicked.connect(self.pick_root)
@@ -727,8 +1203,8 @@ class MainUI(QWidget):
         self.chk_only_tagged.stateChanged.connect(self.on_only_tagged_toggled)
         self.tag_list.itemClicked.connect(self.on_tag_clicked)
         self.root_list.itemClicked.connect(self.on_root_clicked)
-        self.table.itemSelectionChanged.connect(self.refresh_selected_file_tags)
-        self.table.itemDoubleClicked.connect(self.open_file)
+        self.table.selectionModel().selectionChanged.connect(lambda *_: self.refresh_selected_file_tags())
+        self.table.doubleClicked.connect(self.open_file)
         self.btn_assign.clicked.connect(self.assign_tag_to_selected)
         self.btn_untag.clicked.connect(self.untag_selected_from_selected_files)
 
@@ -757,7 +1233,7 @@ class MainUI(QWidget):
 
         # F5 즉시 리프레시
         self.short_refresh = QShortcut(QKeySequence("F5"), self)
-        self.short_refresh.activated.connect(self.refresh_all_counts)
+        self.short_refresh.activated.connect(self._do_refresh_all_counts)
 
         # 시작 시 자동 전체 재스캔(루트 있으면)
         if list_roots():
@@ -765,129 +1241,32 @@ class MainUI(QWidget):
         else:
             QTimer.singleShot(0, self.pick_root)
 
-    # --------------------- 스타일 시트 ---------------------
-    def apply_styles(self):
-        self.setStyleSheet(f"""
-        QWidget {{
-            background: #F3F4F6;
-            color: #111827;
-            font-size: 12pt;
-            font-weight: 800;
-        }}
-        QLineEdit, QComboBox, QListWidget, QTableWidget {{
-            background: #FFFFFF;
-            color: #111827;
-            border: 1px solid #000000;
-            border-radius: 10px;
-            font-weight: 800;
-        }}
-        QLineEdit:focus, QComboBox:focus {{
-            border: 2px solid #000000;
-            background: #FFFFFF;
-        }}
-        #fileTable {{ font-size: 10pt; border-radius: 10px; gridline-color: #FFFFFF; }}
-        QHeaderView::section {{
-            background: #111827;
-            color: #ffffff;
-            padding-top: 2px; padding-bottom: 2px; padding-left: 8px; padding-right: 8px;
-            border: 0;
-            font-weight: 900;
-            font-size: 12pt;
-            border-right: 1px solid #FFFFFF10;
-        }}
-        QHeaderView::section:last {{ border-right: 0; }}
-
-        QTableWidget {{ alternate-background-color: #F7F7F8; }}
-        QTableWidget::item:selected, QListWidget::item:selected {{
-            background: #FDE68A;
-            color: #111111;
-        }}
-
-        QHeaderView#fileTableH::section {{
-            background: #111827; color: #ffffff;
-            padding-top: 2px; padding-bottom: 2px; padding-left: 8px; padding-right: 8px;
-            border: 0;
-            border-right: 2px solid #F59E0B;
-        }}
-        QHeaderView#fileTableH::section:last {{ border-right: 0; }}
-        QHeaderView#fileTableV::section {{
-            background: #111827; color: #ffffff;
-            padding-top: 2px; padding-bottom: 2px; padding-left: 6px; padding-right: 6px;
-            border: 0;
-            border-bottom: 1px solid #F59E0B;
-        }}
-        QTableCornerButton::section {{
-            background: #111827; border: 0;
-            border-right: 2px solid #F59E0B;
-            border-bottom: 1px solid #F59E0B;
-        }}
-
-        QPushButton {{
-            background: #E5E7EB;
-            border: 2px solid #000000;
-            padding: 2px 8px;
-            border-radius: 10px;
-            font-size: 12pt;
-            font-weight: 800;
-        }}
-        QPushButton:hover {{ background: #D1D5DB; }}
-        QPushButton:disabled {{ background: #E5E7EB; color: #9CA3AF; border-color: #000000; }}
-
-        QPushButton#primaryBtn {{
-            background: #2563EB;
-            color: #FFFFFF;
-            border: 2px solid #000000;
-            padding: 2px 8px;
-        }}
-        QPushButton#primaryBtn:hover {{
-            background: #1D4ED8;
-            border: 2px solid #000000;
-        }}
-
-        QCheckBox {{ font-size: 12pt; font-weight: 800; }}
-        QCheckBox::indicator {{
-            width: 18px; height: 18px;
-            border: 2px solid #000000; background: #FFFFFF; border-radius: 4px;
-        }}
-        QCheckBox::indicator:checked {{
-            background: #DC2626; border: 2px solid #000000;
-        }}
-        QCheckBox::indicator:unchecked:hover {{ background: #FEE2E2; }}
-
-        QProgressBar {{ border: 2px solid #000000; border-radius: 6px; height: 10px; text-align: center; }}
-        QProgressBar::chunk {{ background: #2563EB; border-radius: 6px; }}
-
-        QScrollBar:vertical {{ background: #202124; width: 16px; margin: 0px; }}
-        QScrollBar::handle:vertical {{ background: #3D3D3D; border-radius: 6px; min-height: 32px; }}
-        QScrollBar::handle:vertical:hover {{ background: #505050; }}
-        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{ height: 0; }}
-
-        QScrollBar:horizontal {{ background: #202124; height: 16px; margin: 0px; }}
-        QScrollBar::handle:horizontal {{ background: #3D3D3D; border-radius: 6px; min-width: 32px; }}
-        QScrollBar::handle:horizontal:hover {{ background: #505050; }}
-        QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0; }}
-
-        /* 마우스 호버 시 빨간 배경 + 흰 글자 */
-        QTableWidget#fileTable::item:hover {{ background: #DC2626; color: #FFFFFF; }}
-        QTableWidget#fileTable::item:selected:hover {{ background: #DC2626; color: #FFFFFF; }}
-        """)
-
     # --------------------- 진행 표시 슬롯 ---------------------
     def _on_scan_started(self, total: int):
-        self.count_lbl.setText(f"색인 중… (0 / {total:,})")
+        """total == 0 이면 전체 개수를 모르는 스캔 → 진행바를 busy 표시로."""
         self.progress.setVisible(True)
-        self.progress.setMaximum(max(total, 1))
+        self.progress.setMaximum(max(total, 0))
         self.progress.setValue(0)
+        self.count_lbl.setText(f"색인 중… (0 / {total:,})" if total else "색인 중… (0)")
 
     def _on_progress_tick(self, processed: int, total: int):
-        self.progress.setValue(processed)
-        self.count_lbl.setText(f"색인 중… ({processed:,} / {total:,})")
+        if total:
+            self.progress.setValue(processed)
+            self.count_lbl.setText(f"색인 중… ({processed:,} / {total:,})")
+        else:
+            self.count_lbl.setText(f"색인 중… ({processed:,})")
+
+    def _stop_scan_thread(self):
+        """앱 종료 시 진행 중인 스캔을 중단하고 스캔 스레드를 정리."""
+        self._scan_thread.requestInterruption()
+        self._scan_thread.quit()
+        self._scan_thread.wait()
 
     def _on_scan_finished(self):
         self.scan_running = False
         self.progress.setVisible(False)
         self.root_path_edit.clear()
-        self.refresh_all_counts()
+        self._do_refresh_all_counts()
         self.search.setFocus()
 
     # --------------------- 패널 리프레시 ---------------------
@@ -897,49 +1276,54 @@ class MainUI(QWidget):
         all_item.setData(Qt.UserRole, None)
         all_item.setToolTip("등록된 모든 경로 합산 보기")
         self.root_list.addItem(all_item)
+        self._row_by_rootpath = {None: 0}
 
         uniq = sorted({normalize_path(r) for r in list_roots()}, key=str.lower)
         for root in uniq:
             cnt = count_files_under(root)
             it = QListWidgetItem(f"{root} ({cnt:,})")
             it.setData(Qt.UserRole, root)
-            it.setBackground(QBrush(color_for_root_path(root)))
+            it.setBackground(brush_for(color_for_root_path(root)))
             it.setToolTip(root)
             self.root_list.addItem(it)
+            self._row_by_rootpath[root] = self.root_list.count() - 1
 
     def save_state(self):
         set_setting("last_search", self.search.text().strip())
         set_setting("last_only_tagged", "1" if self.chk_only_tagged.isChecked() else "0")
 
     def refresh_all_counts(self):
+        """태그 편집 등에서 호출 — 타이머로 묶어 한 번만 갱신(즉시 필요하면 _do_refresh_all_counts)."""
+        self._refresh_timer.start()
+
+    def _do_refresh_all_counts(self):
+        self._refresh_timer.stop()
         cur_item = self.root_list.currentItem()
         cur_path = cur_item.data(Qt.UserRole) if cur_item else None
         vpos = self.root_list.verticalScrollBar().value()
 
         self.refresh_roots_panel()
 
-        if cur_path is None:
-            self.root_list.setCurrentRow(0)
-        else:
-            for i in range(self.root_list.count()):
-                if self.root_list.item(i).data(Qt.UserRole) == cur_path:
-                    self.root_list.setCurrentRow(i); break
+        idx = self._row_by_rootpath.get(cur_path)
+        if idx is not None:
+            self.root_list.setCurrentRow(idx)
         self.root_list.verticalScrollBar().setValue(vpos)
 
         self.refresh_tags()
         self.refresh_files()
-        self.count_lbl.setText(f"결과: {self.table.rowCount():,}건")
 
     def refresh_tags(self):
         self.tag_list.clear()
         total_cnt = count_all_files()
 
-        self.tag_color_by_name = {}
+        # 델리게이트가 같은 dict를 참조하므로 새로 만들지 않고 비운다
+        self.tag_color_by_name.clear()
 
         all_item = QListWidgetItem(f"전체 파일 ({total_cnt:,})")
         all_item.setData(Qt.UserRole, None)
-        all_item.setBackground(QBrush(QColor(235, 235, 235)))
+        all_item.setBackground(brush_for(QColor(235, 235, 235)))
         self.tag_list.addItem(all_item)
+        self._row_by_tagid = {None: 0}
 
         by_tag = count_files_by_tag()
         self.combo_tag.clear()
@@ -948,12 +1332,13 @@ class MainUI(QWidget):
             it = QListWidgetItem(f"{name} ({cnt:,})")
             it.setData(Qt.UserRole, tid)
             col = color_for_tag(tid, name)
-            it.setBackground(QBrush(col))
+            it.setBackground(brush_for(col))
             self.tag_list.addItem(it)
+            self._row_by_tagid[tid] = self.tag_list.count() - 1
 
             self.combo_tag.addItem(name, userData=tid)
             idx = self.combo_tag.count() - 1
-            self.combo_tag.setItemData(idx, QBrush(col), Qt.BackgroundRole)
+            self.combo_tag.setItemData(idx, brush_for(col), Qt.BackgroundRole)
 
             self.tag_color_by_name[name] = col
 
@@ -996,22 +1381,22 @@ class MainUI(QWidget):
         conn = get_conn(); c = conn.cursor()
         c.execute("SELECT ord FROM tags WHERE id=?;", (tid,))
         row = c.fetchone()
-        if not row: conn.close(); return
+        if not row: return
         cur_ord = row[0]
         if delta < 0:
             c.execute("SELECT id, ord FROM tags WHERE ord<? ORDER BY ord DESC LIMIT 1;", (cur_ord,))
         else:
             c.execute("SELECT id, ord FROM tags WHERE ord>? ORDER BY ord ASC LIMIT 1;", (cur_ord,))
         nb = c.fetchone()
-        if not nb: conn.close(); return
+        if not nb: return
         nb_id, nb_ord = nb
         c.execute("UPDATE tags SET ord=? WHERE id=?;", (nb_ord, tid))
         c.execute("UPDATE tags SET ord=? WHERE id=?;", (cur_ord, nb_id))
-        conn.commit(); conn.close()
+        conn.commit()
         self.refresh_tags()
-        for i in range(self.tag_list.count()):
-            if self.tag_list.item(i).data(Qt.UserRole) == tid:
-                self.tag_list.setCurrentRow(i); break
+        idx = self._row_by_tagid.get(tid)
+        if idx is not None:
+            self.tag_list.setCurrentRow(idx)
 
     def rename_selected_tag(self):
         cur = self.tag_list.currentItem()
@@ -1037,27 +1422,18 @@ class MainUI(QWidget):
         if not new_name:
             return
         conn = get_conn(); c = conn.cursor()
-        c.execute("SELECT id FROM tags WHERE name=?;", (new_name,))
-        row = c.fetchone()
-        if row:
-            new_tid = row[0]
-            if new_tid == old_tid:
-                conn.close(); return
-            c.execute("INSERT OR IGNORE INTO file_tags(file_id, tag_id) "
-                      "SELECT file_id, ? FROM file_tags WHERE tag_id=?;", (new_tid, old_tid))
-            c.execute("DELETE FROM file_tags WHERE tag_id=?;", (old_tid,))
-            c.execute("DELETE FROM tags WHERE id=?;", (old_tid,))
-            conn.commit(); conn.close()
+        with conn:  # 이름 변경/병합을 한 트랜잭션으로(예외 시 롤백)
+            # 같은 이름이 없으면 그대로 이름만 변경(id/순서 유지), 있으면 UNIQUE 충돌로 건너뜀(rowcount 0)
+            c.execute("UPDATE OR IGNORE tags SET name=? WHERE id=?;", (new_name, old_tid))
+            merged = c.rowcount == 0
+            if merged:  # 기존 태그로 파일 옮기고 old 태그 삭제
+                c.execute("INSERT OR IGNORE INTO file_tags(file_id, tag_id) "
+                          "SELECT file_id, (SELECT id FROM tags WHERE name=?) FROM file_tags WHERE tag_id=?;",
+                          (new_name, old_tid))
+                c.execute("DELETE FROM file_tags WHERE tag_id=?;", (old_tid,))
+                c.execute("DELETE FROM tags WHERE id=?;", (old_tid,))
+        if merged:
             QMessageBox.information(self, "안내", f"동일 이름이 있어 태그를 병합했습니다: {new_name}")
-        else:
-            try:
-                c.execute("UPDATE tags SET name=? WHERE id=?;", (new_name, old_tid))
-                conn.commit()
-            except sqlite3.IntegrityError:
-                conn.close()
-                QMessageBox.warning(self, "오류", "태그 이름이 중복되어 변경할 수 없습니다.")
-                return
-            conn.close()
         self.refresh_all_counts()
 
     # --------------------- 파일 목록/선택 ---------------------
@@ -1065,66 +1441,55 @@ class MainUI(QWidget):
         self.save_state(); self.refresh_files()
 
     def refresh_files(self):
-        self.table.setSortingEnabled(False)
-        self.table.setRowCount(0)
-        rows = list_files(
+        """목록을 비우고 FILE_ROW_CHUNK 행씩 이벤트 루프 사이사이에 채운다(첫 청크는 즉시)."""
+        self._pending_rows = iter_files(
             self.search.text().strip(),
             list(self.selected_tag_ids),
             self.chk_only_tagged.isChecked(),
             self.root_filter
         )
-        self.count_lbl.setText(f"결과: {len(rows):,}건")
-
-        for fid, path, size, mtime, tag_text in rows:
-            r = self.table.rowCount(); self.table.insertRow(r)
-            fname = os.path.basename(path); fdir = os.path.dirname(path)
-
-            it_file = QTableWidgetItem(fname); it_file.setData(Qt.UserRole, path)
-            it_file.setToolTip(path)
-
-            # ★ 파일 크기: 탐색기 스타일
-            it_size = QTableWidgetItem(format_size_explorer(size))
-            it_size.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.file_model.set_rows(())
+        self.table.horizontalHeader().setSortIndicator(2, Qt.DescendingOrder)
+        self._flush_rows_chunk(self._pending_rows)
 
-            it_mtim = QTableWidgetItem(datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S"))
-            it_tags = QTableWidgetItem(tag_text or "")
-            it_dir  = QTableWidgetItem(fdir); it_dir.setToolTip(path)
-            it_id   = QTableWidgetItem(str(fid))
-
-            if tag_text:
-                first_tag = (tag_text.split(",")[0] or "").strip()
-                if first_tag:
-                    col = self.tag_color_by_name.get(first_tag, color_for_tag(None, first_tag))
-                    it_file.setBackground(QBrush(col))
-
-            self.table.setItem(r, 0, it_file)
-            self.table.setItem(r, 1, it_size)
-            self.table.setItem(r, 2, it_mtim)
-            self.table.setItem(r, 3, it_tags)
-            self.table.setItem(r, 4, it_dir)
-            self.table.setItem(r, 5, it_id)
-
-        self.table.setSortingEnabled(True)
-        self.table.sortItems(2, Qt.DescendingOrder)
+    def _flush_rows_chunk(self, rows_iter):
+        if rows_iter is not self._pending_rows:  # 그 사이 새 refresh 가 시작됨
+            return
+        chunk = list(islice(rows_iter, FILE_ROW_CHUNK))
+        if chunk:
+            self.file_model.append_rows(chunk)
+        if len(chunk) == FILE_ROW_CHUNK:
+            self.count_lbl.setText(f"결과: {self.file_model.rowCount():,}건…")
+            QTimer.singleShot(0, lambda: self._flush_rows_chunk(rows_iter))
+            return
+        self._pending_rows = None
+        n = self.file_model.rowCount()
+        if not n:  # 결과 없음 → 정렬/뷰 갱신 생략
+            self.count_lbl.setText("결과: 0건")
+            return
+        hh = self.table.horizontalHeader()  # 채우는 동안 헤더를 눌렀으면 그 기준으로
+        if (hh.sortIndicatorSection(), hh.sortIndicatorOrder()) != (2, Qt.DescendingOrder):
+            self.file_model.sort(hh.sortIndicatorSection(), hh.sortIndicatorOrder())
+        self.count_lbl.setText(f"결과: {n:,}건")
 
     def selected_file_ids(self):
         ids = []
         if self.table.selectionModel():
             for idx in self.table.selectionModel().selectedRows():
-                ids.append(int(self.table.item(idx.row(), 5).text()))
+                ids.append(self.file_model.file_id(idx.row()))
         return ids
 
     def get_selected_paths(self):
         paths = []
         if self.table.selectionModel():
             for idx in self.table.selectionModel().selectedRows():
-                p = self.table.item(idx.row(), 0).data(Qt.UserRole)
+                p = self.file_model.path(idx.row())
                 if p: paths.append(p)
         return paths
 
     # --------------------- 테이블 컨텍스트 메뉴/액션 ---------------------
     def on_table_context_menu(self, pos):
-        if not self.table.itemAt(pos):
+        if not self.table.indexAt(pos).isValid():
             return
         menu = QMenu(self)
         act_open = menu.addAction("열기")
@@ -1149,10 +1514,11 @@ class MainUI(QWidget):
         try:
             if sys.platform.startswith("win"):
                 os.startfile(full_path)
-            elif sys.platform == "darwin":
-                os.system(f'open "{full_path}"')
-            else:
-                os.system(f'xdg-open "{full_path}"')
+            else:  # 셸 없이 바로 실행, 기다리지 않음
+                opener = "open" if sys.platform == "darwin" else "xdg-open"
+                subprocess.Popen([opener, full_path], start_new_session=True,
+                                 stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.DEVNULL)
         except Exception as e:
             QMessageBox.warning(self, "오류", f"파일 열기 실패:\n{e}")
 
@@ -1163,7 +1529,7 @@ class MainUI(QWidget):
         for tid, name in list_file_tags(ids[0]):
             it = QListWidgetItem(name)
             it.setData(Qt.UserRole, tid)
-            it.setBackground(QBrush(color_for_tag(tid, name)))
+            it.setBackground(brush_for(color_for_tag(tid, name)))
             self.sel_tags.addItem(it)
 
     def assign_tag_to_selected(self):
@@ -1174,9 +1540,8 @@ class MainUI(QWidget):
         if not ids:
             QMessageBox.information(self, "안내", "파일을 먼저 선택하세요."); return
         conn = get_conn(); cur = conn.cursor()
-        for fid in ids:
-            cur.execute("INSERT OR IGNORE INTO file_tags(file_id, tag_id) VALUES(?, ?);", (fid, tid))
-        conn.commit(); conn.close()
+        cur.executemany(SQL_ADD_FILE_TAG, ((fid, tid) for fid in ids))
+        conn.commit()
         self.refresh_all_counts()
 
     def untag_selected_from_selected_files(self):
@@ -1186,9 +1551,8 @@ class MainUI(QWidget):
         fid = ids[0]; selected = self.sel_tags.selectedItems()
         if not selected: return
         conn = get_conn(); cur = conn.cursor()
-        for it in selected:
-            cur.execute("DELETE FROM file_tags WHERE file_id=? AND tag_id=?;", (fid, it.data(Qt.UserRole)))
-        conn.commit(); conn.close()
+        cur.executemany(SQL_DEL_FILE_TAG, [(fid, it.data(Qt.UserRole)) for it in selected])
+        conn.commit()
         self.refresh_all_counts()
 
     def rename_selected_file(self):
@@ -1217,9 +1581,12 @@ class MainUI(QWidget):
         if QMessageBox.question(self, "삭제 확인",
                                 f"{len(ps)}개 파일을 삭제(휴지통)할까요?") != QMessageBox.StandardButton.Yes:
             return
-        for p in ps:
-            if recycle_delete(p):
-                db_delete_file_by_path(p)
+        if recycle_delete_many(ps):
+            done = ps
+        else:  # 일부만 지워졌을 수 있으므로 실제로 사라진 것만 DB에서 정리
+            done = [p for p in ps if not os.path.lexists(p)]
+        if done:
+            db_delete_files_by_paths(done)
         self.refresh_all_counts()
 
     # --------------------- 루트/스캔 ---------------------
@@ -1261,27 +1628,7 @@ class MainUI(QWidget):
             return
 
         self.scan_started.emit(fs_total)
-        step = max(1, fs_total // 100)
-
-        def worker():
-            processed = 0
-            try:
-                add_root(root)
-                for dp, _, files in os.walk(root):
-                    for fn in files:
-                        full = os.path.join(dp, fn)
-                        try:
-                            upsert_file(full)
-                        except Exception:
-                            pass
-                        processed += 1
-                        if (processed % step == 0) or (processed == fs_total):
-                            self.progress_tick.emit(processed, fs_total)
-                remove_missing_under(root)
-            finally:
-                self.scan_finished.emit()
-
-        threading.Thread(target=worker, daemon=True).start()
+        self.scan_requested.emit([root], fs_total)
 
     def rescan_selected_root(self):
         if self._busy_forbid_if_running("재스캔"):
@@ -1303,36 +1650,11 @@ class MainUI(QWidget):
             return
 
         uniq = list({normalize_path(r) for r in roots})
-        total = 0
-        for r in uniq:
-            try:
-                total += count_files_on_disk(r)
-            except Exception:
-                pass
 
+        # 미리 세느라 트리를 한 번 더 도는 대신 개수 미정(busy) 진행바로 표시
         self.scan_running = True
-        self.scan_started.emit(total if total > 0 else 1)
-
-        def worker():
-            processed = 0
-            try:
-                for root in uniq:
-                    add_root(root)
-                    for dp, _, files in os.walk(root):
-                        for fn in files:
-                            full = os.path.join(dp, fn)
-                            try:
-                                upsert_file(full)
-                            except Exception:
-                                pass
-                            processed += 1
-                            if processed % 500 == 0 or processed == total:
-                                self.progress_tick.emit(processed, total if total > 0 else 1)
-                    remove_missing_under(root)
-            finally:
-                self.scan_finished.emit()
-
-        threading.Thread(target=worker, daemon=True).start()
+        self.scan_started.emit(0)
+        self.scan_requested.emit(uniq, 0)
 
     def remove_selected_root(self):
         if self._busy_forbid_if_running("제거"):
@@ -1397,6 +1719,7 @@ class MainUI(QWidget):
 def main():
     init_db()
     app = QApplication(sys.argv)
+    app.setStyleSheet(_STYLESHEET)  # 스타일 시트 적용(앱 전체 1회)
     ui = MainUI(); ui.show()
     sys.exit(app.exec())
 
@@ -9,18 +9,25 @@ import os
 import sys
 import sqlite3
 import threading
-import hashlib
+import time
+import queue
+import atexit
+import zlib
 import ctypes
+import subprocess
 import webbrowser
 from ctypes import wintypes
-from pathlib import Path
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice, product
 
-from PySide6.QtCore import Qt, Signal, QTimer, QRectF
+from PySide6.QtCore import (
+    Qt, Signal, Slot, QObject, QThread, QTimer, QRectF, QAbstractTableModel, QModelIndex
+)
 from PySide6.QtGui import QColor, QBrush, QShortcut, QKeySequence, QPen
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
-    QFileDialog, QTableWidget, QTableWidgetItem, QListWidget, QListWidgetItem,
+    QFileDialog, QTableView, QListWidget, QListWidgetItem,
     QSplitter, QMessageBox, QLabel, QCheckBox, QAbstractItemView, QComboBox,
     QHeaderView, QProgressBar, QInputDialog, QMenu, QSizePolicy,
     QStyledItemDelegate, QStyleOptionViewItem, QStyle
@@ -30,6 +37,12 @@ from PySide6.QtWidgets import (
 DB_PATH = "filetags.db"
 APP_TITLE = "[상우고] Arang's 파일 태그 검색기(v.0.1.4) / 제작 : 독서하는 경호t"
 BTN_H, EDIT_H, SEARCH_W, SEARCH_BTN_W = 26, 28, 190, 60
+SCAN_BATCH = 5000  # 스캔 시 한 트랜잭션에 UPSERT 할 행 수
+PROGRESS_STEP = 1000  # 스캔 진행 시그널을 보내는 파일 수 간격
+FETCH_BATCH = 1000  # 파일 목록 fetchmany 단위(행)
+SQL_IN_CHUNK = 900  # IN (...) 한 번에 묶는 값 수 (SQLITE_MAX_VARIABLE_NUMBER 이하)
+SCAN_WORKERS = 8  # 디렉터리 단위 병렬 scandir/stat 스레드 수
+REFINE_CACHE_MAX = 20000  # 검색어를 이어 칠 때 메모리에서 다시 거를 직전 결과 최대 행 수
 
 PALETTE = [
     QColor(255,204,204), QColor(255,229,204), QColor(255,255,204), QColor(229,255,204),
@@ -39,11 +52,92 @@ PALETTE = [
 ]
 
 # ========================= 유틸리티 =========================
+_SEP = os.sep
+# 이 문자열이 들어 있으면 normpath 가 경로를 바꿀 수 있음 (대체 구분자, 중복 구분자, '.', '..')
+_NORM_SLOW = tuple(x for x in (os.altsep, _SEP * 2, f"{_SEP}.{_SEP}", "..") if x)
+
+@lru_cache(maxsize=1 << 16)
+def _normalize_path_impl(p: str) -> str:
+    np = os.path.normpath(p)
+    return np + _SEP if len(np) == 2 and np[1] == ':' else np
+
 def normalize_path(p: str) -> str:
-    """경로 정규화"""
+    """경로 정규화 (이미 정규화된 경로는 normpath 없이 그대로 반환)"""
     if not p: return p
-    np = os.path.normpath(p)
-    return np + os.sep if len(np) == 2 and np[1] == ':' else np
+    if (len(p) > 2 and p[0] != "." and not p.endswith(_SEP) and not p.endswith(_SEP + ".")
+            and not any(x in p for x in _NORM_SLOW)):
+        return p
+    return _normalize_path_impl(p)
+
+def _prefix_bounds(root: str):
+    """루트 하위 경로 범위 [lo, hi) — path >= lo AND path < hi 로 인덱스 범위 검색.
+    lo 는 구분자로 끝나게 맞춰 'D:\\a' 가 'D:\\ab\\..' 까지 잡지 않도록 함"""
+    lo = normalize_path(root)
+    if not lo.endswith(_SEP): lo += _SEP
+    return lo, lo[:-1] + chr(ord(lo[-1]) + 1)
+
+def _scan_tree(root: str):
+    """os.scandir 기반 하위 파일 DirEntry 제너레이터 (명시적 스택, 폴더 링크는 따라가지 않음)"""
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False): stack.append(e.path)
+                        elif not e.is_dir(): yield e
+                    except OSError: pass
+        except OSError: pass
+
+def _scan_file_batches(root: str, max_workers: int = SCAN_WORKERS):
+    """루트 하위 디렉터리를 스레드 풀에서 scandir+stat 하여
+    (정규화 경로, size, mtime) 묶음(최대 PROGRESS_STEP개, 디렉터리 끝의 나머지는 더 작음)을 호출 스레드로 yield.
+    DB 쓰기는 호출 스레드 하나에서만 하도록 결과는 큐로만 넘김"""
+    q = queue.Queue()
+    lock = threading.Lock()
+    pending = 1  # 아직 끝나지 않은 디렉터리 작업 수
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    
+    def visit(d):
+        nonlocal pending
+        out = []
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            with lock: pending += 1
+                            try: pool.submit(visit, e.path)
+                            except RuntimeError:  # 소비자가 중단해 풀이 닫힘
+                                with lock: pending -= 1
+                                return
+                        elif e.is_file():  # 일반 파일만 (깨진 링크 등 제외)
+                            st = e.stat()
+                            out.append((normalize_path(e.path), st.st_size, st.st_mtime))
+                            if len(out) >= PROGRESS_STEP:
+                                q.put(out); out = []
+                    except OSError: pass
+        except OSError: pass
+        finally:
+            if out: q.put(out)
+            with lock:
+                pending -= 1
+                last = pending == 0
+            if last: q.put(None)  # 종료 신호
+    
+    pool.submit(visit, root)
+    try:
+        while (chunk := q.get()) is not None:
+            yield chunk
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _batched(iterable, n: int):
+    """iterable 을 최대 n개씩 리스트로 묶어 반환"""
+    it = iter(iterable)
+    while batch := list(islice(it, n)):
+        yield batch
 
 def format_size_explorer(n: int) -> str:
     """Windows 탐색기 유사 크기 표기"""
@@ -56,23 +150,109 @@ def format_size_explorer(n: int) -> str:
     gb = mb / 1024.0
     return f"{gb:.1f}".rstrip("0").rstrip(".") + "GB"
 
+@lru_cache(maxsize=4096)
+def format_mtime(ts: int) -> str:
+    """수정시각(초 단위 정수) → 로컬 "YYYY-MM-DD HH:MM:SS" (보이는 셀만 포맷, 다시 그릴 때는 캐시)"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+@lru_cache(maxsize=2048)
+def _palette_index_for_name(name: str) -> int:
+    """이름 → 팔레트 인덱스 (crc32 하위 4비트, 이름별 1회 계산)"""
+    return zlib.crc32(name.encode()) & 15
+
+@lru_cache(maxsize=4096)
 def color_for_item(identifier, name: str = None) -> QColor:
-    """태그/경로 색상 생성"""
+    """태그/경로 색상 생성 (인자별 1회 계산)"""
     if isinstance(identifier, int):
         return PALETTE[identifier % len(PALETTE)]
-    h = int(hashlib.sha1((name or identifier or '').encode()).hexdigest()[:2], 16)
-    return PALETTE[h % len(PALETTE)]
+    return PALETTE[_palette_index_for_name(name or identifier or '')]
 
 # ========================= DB 관리 =========================
+def _like_escape(s: str) -> str:
+    """LIKE 패턴 문자(%, _, \\) 이스케이프 (ESCAPE '\\' 와 함께 사용)"""
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+_ASCII_LOWER = {c: c + 32 for c in range(ord("A"), ord("Z") + 1)}
+
+def _like_fold(s: str) -> str:
+    """LIKE 와 같은 대소문자 무시 (ASCII A–Z 만 소문자로, 'É' 등 비ASCII 는 그대로)"""
+    return s.translate(_ASCII_LOWER)
+
+# 자주 쓰는 SQL은 상수로 고정해 연결별 prepared statement 캐시(cached_statements)가 항상 적중하도록 함
+SQL_GET_SETTING = "SELECT value FROM settings WHERE key=?;"
+SQL_SET_SETTING = """INSERT INTO settings(key,value) VALUES(?,?)
+                     ON CONFLICT(key) DO UPDATE SET value=excluded.value;"""
+SQL_UPSERT_FILE = """INSERT INTO files(path,size,mtime,hash) VALUES(?,?,?,NULL)
+                     ON CONFLICT(path) DO UPDATE SET size=excluded.size, mtime=excluded.mtime;"""
+SQL_DEL_FILE_BY_ID = "DELETE FROM files WHERE id=?;"
+SQL_ADD_FILE_TAG = "INSERT OR IGNORE INTO file_tags(file_id, tag_id) VALUES(?, ?);"
+SQL_LIST_FILE_TAGS = """SELECT t.id, t.name FROM tags t
+                        JOIN file_tags ft ON ft.tag_id=t.id
+                        WHERE ft.file_id=? ORDER BY t.ord, t.name;"""
+SQL_COUNT_FILES_BY_TAG = """SELECT t.id, COALESCE(COUNT(ft.file_id),0) AS cnt
+                            FROM tags t LEFT JOIN file_tags ft ON ft.tag_id=t.id
+                            GROUP BY t.id ORDER BY t.ord, t.name;"""
+
+# 파일별 태그 문자열: 태그 패널 순서(ord)로 이어 붙임 (집계 내 ORDER BY 는 SQLite 3.44+)
+_TAGS_AGG = ("GROUP_CONCAT(t.name, ', ' ORDER BY t.ord, t.name)"
+             if sqlite3.sqlite_version_info >= (3, 44, 0) else "GROUP_CONCAT(t.name, ', ')")
+
+# 파일별 첫 태그(ord 순) 이름: 행 배경색용 — 태그 문자열을 다시 쪼개지 않도록 별도 열로 받음
+_FIRST_TAG = ("(SELECT t1.name FROM file_tags ft1 JOIN tags t1 ON t1.id=ft1.tag_id"
+              " WHERE ft1.file_id=f.id ORDER BY t1.ord, t1.name LIMIT 1)")
+
+@lru_cache(maxsize=32)
+def _list_files_sql(n_tags: int, search_mode: str, only_tagged: bool, has_root: bool) -> str:
+    """list_files 쿼리 모양별 SQL 캐시 (같은 문자열 → sqlite 준비문 캐시 재사용)
+    search_mode: "" (검색 없음) / "like" / "fts" (files_fts trigram 색인)"""
+    joins = ""
+    if n_tags:  # 선택 태그(AND): 태그 수만큼 self-JOIN 대신 IN 한 번 + HAVING
+        joins = (f" JOIN (SELECT file_id FROM file_tags WHERE tag_id IN ({','.join('?' * n_tags)})"
+                 f" GROUP BY file_id HAVING COUNT(DISTINCT tag_id)={n_tags}) sel ON sel.file_id=f.id")
+    elif only_tagged:  # 태그 조건이 있으면 이미 태그 있는 파일로 한정되므로 생략
+        joins = " JOIN (SELECT DISTINCT file_id FROM file_tags) tagged ON tagged.file_id=f.id"
+    where = []
+    if search_mode == "fts": where.append("f.id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH ?)")
+    elif search_mode == "like": where.append("f.path LIKE ? ESCAPE '\\'")
+    if has_root: where.append("f.path LIKE ?")
+    where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+    return f"""SELECT f.id, f.path, f.size, f.mtime, {_TAGS_AGG} AS tags, {_FIRST_TAG} AS first_tag
+               FROM files f{joins}
+               LEFT JOIN file_tags ft ON ft.file_id=f.id
+               LEFT JOIN tags t ON t.id=ft.tag_id{where_sql}
+               GROUP BY f.id ORDER BY f.path ASC;"""
+
 class DBManager:
     """DB 연결 및 쿼리 관리 클래스"""
     
-    @staticmethod
-    def get_conn():
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("PRAGMA foreign_keys = ON;")
+    _tls = threading.local()  # 스레드별 연결 캐시 (UI 스레드/스캔 스레드 각 1개)
+    fts_enabled = False  # files_fts(FTS5 trigram) 사용 가능 여부 (init_db에서 결정)
+    
+    @classmethod
+    def get_conn(cls):
+        """스레드별로 캐시된 연결 반환 (WAL/성능 PRAGMA 적용, close 하지 않고 재사용)"""
+        conn = getattr(cls._tls, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+            # page_size 는 새 DB 에서만 적용되며 WAL 전환보다 먼저 지정해야 함
+            for pragma in ("page_size = 8192", "journal_mode = WAL", "synchronous = NORMAL",
+                           "temp_store = MEMORY", "cache_size = -64000", "foreign_keys = ON",
+                           "mmap_size = 268435456"):
+                conn.execute(f"PRAGMA {pragma};")
+            cls._tls.conn = conn
         return conn
     
+    @classmethod
+    def close_conn(cls):
+        """현재 스레드의 캐시된 연결 종료"""
+        conn = getattr(cls._tls, "conn", None)
+        if conn is not None:
+            # 닫기 전 필요한 인덱스 통계만 갱신(ANALYZE) → 태그 조인 계획이 새 인덱스를 고르도록
+            try: conn.execute("PRAGMA optimize;")
+            except sqlite3.Error: pass
+            conn.close()
+            cls._tls.conn = None
+    
     @classmethod
     def init_db(cls):
         """DB 초기화"""
@@ -102,11 +282,37 @@ class DBManager:
             "CREATE INDEX IF NOT EXISTS idx_files_path ON files(path);",
             "CREATE INDEX IF NOT EXISTS idx_tags_name ON tags(name);",
             "CREATE INDEX IF NOT EXISTS idx_file_tags_file ON file_tags(file_id);",
+            "CREATE INDEX IF NOT EXISTS idx_file_tags_tag_file ON file_tags(tag_id, file_id);",
             "CREATE INDEX IF NOT EXISTS idx_files_mtime ON files(mtime);"
         ]
         for idx in indices: cur.execute(idx)
         conn.commit()
         
+        # 파일명 부분검색용 FTS5 trigram 미러 (SQLite 3.34+, 미지원 빌드는 LIKE 유지)
+        cur.execute("SAVEPOINT fts;")
+        try:
+            cur.execute("SELECT 1 FROM sqlite_master WHERE name='files_fts';")
+            had_fts = cur.fetchone() is not None
+            fts = [
+                """CREATE VIRTUAL TABLE IF NOT EXISTS files_fts
+                   USING fts5(path, content='files', content_rowid='id', tokenize='trigram');""",
+                """CREATE TRIGGER IF NOT EXISTS files_fts_ai AFTER INSERT ON files BEGIN
+                   INSERT INTO files_fts(rowid, path) VALUES (new.id, new.path); END;""",
+                """CREATE TRIGGER IF NOT EXISTS files_fts_ad AFTER DELETE ON files BEGIN
+                   INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.id, old.path); END;""",
+                """CREATE TRIGGER IF NOT EXISTS files_fts_au AFTER UPDATE OF path ON files BEGIN
+                   INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.id, old.path);
+                   INSERT INTO files_fts(rowid, path) VALUES (new.id, new.path); END;"""
+            ]
+            for sql in fts: cur.execute(sql)
+            if not had_fts:  # 기존 DB 최초 1회: files 내용으로 색인 채우기
+                cur.execute("INSERT INTO files_fts(files_fts) VALUES ('rebuild');")
+            cls.fts_enabled = True
+        except sqlite3.OperationalError:
+            cur.execute("ROLLBACK TO fts;")
+            cls.fts_enabled = False
+        cur.execute("RELEASE fts;")
+        
         # tags.ord 백필
         cur.execute("SELECT COUNT(*) FROM tags WHERE ord IS NULL;")
         if cur.fetchone()[0]:
@@ -114,39 +320,80 @@ class DBManager:
             for i, (tid,) in enumerate(cur.fetchall(), 1):
                 cur.execute("UPDATE tags SET ord=? WHERE id=?;", (i, tid))
             conn.commit()
-        conn.close()
     
     @classmethod
     def get_setting(cls, key, default=None):
         conn = cls.get_conn()
         cur = conn.cursor()
-        cur.execute("SELECT value FROM settings WHERE key=?;", (key,))
+        cur.execute(SQL_GET_SETTING, (key,))
         row = cur.fetchone()
-        conn.close()
         return row[0] if row else default
     
     @classmethod
     def set_setting(cls, key, value):
+        cls.set_settings([(key, value)])
+    
+    @classmethod
+    def set_settings(cls, items):
+        """(key, value) 묶음을 한 트랜잭션으로 저장"""
+        conn = cls.get_conn()
+        with conn:
+            conn.executemany(SQL_SET_SETTING, items)
+    
+    @classmethod
+    def add_root(cls, path: str):
+        """루트 추가 (이미 있으면 스캔 시각 갱신)"""
+        _normalize_path_impl.cache_clear()
         conn = cls.get_conn()
         cur = conn.cursor()
-        cur.execute("""INSERT INTO settings(key,value) VALUES(?,?)
-                       ON CONFLICT(key) DO UPDATE SET value=excluded.value;""", (key, value))
+        cur.execute("""INSERT INTO roots(path,last_scanned) VALUES(?,strftime('%s','now'))
+                       ON CONFLICT(path) DO UPDATE SET last_scanned=strftime('%s','now');""",
+                    (normalize_path(path),))
         conn.commit()
-        conn.close()
     
     @classmethod
-    def upsert_file(cls, path: str):
-        """파일 메타 저장"""
-        p = Path(path)
-        if not p.is_file(): return
-        st = p.stat()
+    def upsert_files_many(cls, rows):
+        """(정규화 경로, size, mtime) 묶음을 한 트랜잭션으로 저장"""
+        conn = cls.get_conn()
+        with conn:
+            conn.executemany(SQL_UPSERT_FILE, rows)
+    
+    @classmethod
+    def counts_by_root(cls):
+        """등록된 루트별 (파일 개수, 최대 mtime) 을 한 쿼리로 조회 → {루트: (cnt, max_m)}"""
         conn = cls.get_conn()
         cur = conn.cursor()
-        cur.execute("""INSERT INTO files(path,size,mtime,hash) VALUES(?,?,?,NULL)
-                       ON CONFLICT(path) DO UPDATE SET size=excluded.size, mtime=excluded.mtime;""",
-                    (normalize_path(str(p)), st.st_size, st.st_mtime))
-        conn.commit()
-        conn.close()
+        cur.execute("SELECT path FROM roots;")
+        roots = {normalize_path(r) for (r,) in cur.fetchall() if r}
+        if not roots: return {}
+        # 구분자까지 포함한 접두사 범위 → idx_files_path 범위 검색 ('data' 가 'data2' 를 세지 않음)
+        bounds = [(r, *_prefix_bounds(r)) for r in roots]
+        cur.execute(f"""WITH b(root, lo, hi) AS (VALUES {','.join(['(?,?,?)'] * len(bounds))})
+                        SELECT b.root, COUNT(f.id), COALESCE(MAX(f.mtime),0) FROM b
+                        LEFT JOIN files f ON f.path >= b.lo AND f.path < b.hi
+                        GROUP BY b.root;""", [v for b in bounds for v in b])
+        return {r: (int(n), float(mx)) for r, n, mx in cur.fetchall()}
+    
+    @classmethod
+    def dashboard_counts(cls):
+        """루트별/태그별/전체 파일 개수를 한 읽기 트랜잭션(같은 스냅샷)에서 조회
+        → ({루트: (cnt, max_m)}, {태그 id: cnt}, 전체 개수)"""
+        conn = cls.get_conn()
+        cur = conn.cursor()
+        # SAVEPOINT: 열린 트랜잭션이 없으면 새로 시작, 있으면 그 안에 중첩 (BEGIN 은 중첩 불가)
+        cur.execute("SAVEPOINT counts;")
+        try:
+            by_root = cls.counts_by_root()
+            cur.execute(SQL_COUNT_FILES_BY_TAG)
+            by_tag = dict(cur.fetchall())
+            cur.execute("SELECT COUNT(*) FROM files;")
+            total = int(cur.fetchone()[0] or 0)
+        except:
+            cur.execute("ROLLBACK TO counts;")
+            cur.execute("RELEASE counts;")
+            raise
+        cur.execute("RELEASE counts;")
+        return by_root, by_tag, total
     
     @classmethod
     def count_and_stats(cls, root: str = None, is_disk: bool = False):
@@ -154,13 +401,12 @@ class DBManager:
         if is_disk:
             if not root: return 0, 0.0
             total, max_m = 0, 0.0
-            for dp, _, files in os.walk(normalize_path(root)):
-                total += len(files)
-                for fn in files:
-                    try:
-                        mt = os.path.getmtime(os.path.join(dp, fn))
-                        if mt > max_m: max_m = mt
-                    except: pass
+            for e in _scan_tree(normalize_path(root)):
+                total += 1
+                try:
+                    mt = e.stat().st_mtime
+                    if mt > max_m: max_m = mt
+                except OSError: pass
             return total, max_m
         else:
             conn = cls.get_conn()
@@ -172,106 +418,127 @@ class DBManager:
             else:
                 cur.execute("SELECT COUNT(*), COALESCE(MAX(mtime),0) FROM files;")
             n, mx = cur.fetchone()
-            conn.close()
             return int(n or 0), float(mx or 0.0)
     
     @classmethod
     def remove_missing_under(cls, root: str):
         """존재하지 않는 파일 정리"""
         root = normalize_path(root)
+        on_disk = {normalize_path(e.path) for e in _scan_tree(root)}
         conn = cls.get_conn()
         cur = conn.cursor()
-        cur.execute("SELECT id, path FROM files WHERE path LIKE ?;", (f"{root}%",))
-        rows = cur.fetchall()
-        removed = 0
-        for fid, fpath in rows:
-            if not Path(fpath).exists():
-                cur.execute("DELETE FROM files WHERE id=?;", (fid,))
-                removed += 1
-        conn.commit()
-        conn.close()
-        return removed
+        # 형제 루트('data' 와 'data2')의 파일을 누락으로 지우지 않도록 구분자까지 포함한 범위로 한정
+        cur.execute("SELECT id, path FROM files WHERE path >= ? AND path < ?;", _prefix_bounds(root))
+        missing = [(fid,) for fid, fpath in cur.fetchall() if fpath not in on_disk]
+        with conn:
+            cur.executemany(SQL_DEL_FILE_BY_ID, missing)
+        return len(missing)
     
     @classmethod
     def ensure_tag(cls, name: str):
         """태그 생성 또는 조회"""
         name = (name or "").strip()
         if not name: return None
+        return cls.ensure_tags_many([name]).get(name)
+    
+    @classmethod
+    def ensure_tags_many(cls, names):
+        """여러 태그를 한 트랜잭션으로 생성/조회 → {이름: id}"""
+        names = list(dict.fromkeys(n for n in (x.strip() for x in names if x) if n))
+        if not names: return {}
+        ph = ",".join("?" * len(names))
         conn = cls.get_conn()
         cur = conn.cursor()
-        cur.execute("SELECT COALESCE(MAX(ord),0)+1 FROM tags;")
-        nxt = cur.fetchone()[0]
-        cur.execute("INSERT OR IGNORE INTO tags(name,ord) VALUES(?,?);", (name, nxt))
-        cur.execute("SELECT id FROM tags WHERE name=?;", (name,))
-        row = cur.fetchone()
-        conn.commit()
-        conn.close()
-        return row[0] if row else None
+        with conn:
+            cur.execute(f"SELECT name, id FROM tags WHERE name IN ({ph});", names)
+            found = dict(cur.fetchall())
+            missing = [n for n in names if n not in found]
+            if missing:
+                cur.execute("SELECT COALESCE(MAX(ord),0)+1 FROM tags;")
+                base = cur.fetchone()[0]
+                cur.executemany("INSERT INTO tags(name,ord) VALUES(?,?);",
+                                [(n, base + i) for i, n in enumerate(missing)])
+                cur.execute(f"SELECT name, id FROM tags WHERE name IN ({ph});", names)
+                found = dict(cur.fetchall())
+        return found
     
     @classmethod
-    def list_files(cls, search_text, tag_ids, only_tagged, root_prefix=None):
-        """파일 목록 조회"""
-        params, where, joins = [], [], []
-        
+    def assign_tags_many(cls, file_ids, tag_ids):
+        """파일들 × 태그들 연결을 한 트랜잭션으로 추가"""
+        conn = cls.get_conn()
+        with conn:
+            conn.executemany(SQL_ADD_FILE_TAG, product(file_ids, tag_ids))
+    
+    @classmethod
+    def iter_files(cls, search_text, tag_ids, only_tagged, root_prefix=None):
+        """파일 목록 조회 (FETCH_BATCH 단위로 읽어 내놓는 제너레이터)"""
+        tag_ids = list(dict.fromkeys(tag_ids or ()))
+        params, search_mode = list(tag_ids), ""
         if search_text:
-            where.append("f.path LIKE ?")
-            params.append(f"%{search_text}%")
-        if only_tagged:
-            where.append("EXISTS (SELECT 1 FROM file_tags x WHERE x.file_id=f.id)")
-        if tag_ids:
-            for i, tid in enumerate(tag_ids):
-                joins.append(f"JOIN file_tags ft{i} ON ft{i}.file_id=f.id AND ft{i}.tag_id=?")
-                params.insert(0, tid)
-        if root_prefix:
-            where.append("f.path LIKE ?")
-            params.append(f"{normalize_path(root_prefix)}%")
-        
-        join_sql = " ".join(joins)
-        where_sql = (" WHERE " + " AND ".join(where)) if where else ""
-        
-        sql = f"""SELECT f.id, f.path, f.size, f.mtime,
-                         (SELECT GROUP_CONCAT(t.name, ', ')
-                          FROM tags t JOIN file_tags ft ON ft.tag_id=t.id
-                          WHERE ft.file_id=f.id) AS tags
-                  FROM files f {join_sql} {where_sql}
-                  ORDER BY f.path ASC;"""
+            # trigram 색인은 3글자 이상, 경로 구분자가 없는 검색어에만 사용
+            if cls.fts_enabled and len(search_text) >= 3 and not any(c in search_text for c in "\\/"):
+                search_mode = "fts"
+                params.append('"' + search_text.replace('"', '""') + '"')
+            else:
+                search_mode = "like"
+                params.append(f"%{_like_escape(search_text)}%")
+        if root_prefix: params.append(f"{normalize_path(root_prefix)}%")
         
+        sql = _list_files_sql(len(tag_ids), search_mode, bool(only_tagged) and not tag_ids, bool(root_prefix))
         conn = cls.get_conn()
         cur = conn.cursor()
+        cur.arraysize = FETCH_BATCH
         cur.execute(sql, params)
-        rows = cur.fetchall()
-        conn.close()
-        return rows
+        while rows := cur.fetchmany():
+            yield from rows
+    
+    @classmethod
+    def list_files(cls, search_text, tag_ids, only_tagged, root_prefix=None):
+        """파일 목록 조회"""
+        return list(cls.iter_files(search_text, tag_ids, only_tagged, root_prefix))
 
 # ========================= 파일 시스템 =========================
 def show_in_explorer(path: str):
-    """탐색기에서 파일 표시"""
-    if sys.platform.startswith("win"):
-        os.system(f'explorer /select,"{path}"')
-    elif sys.platform == "darwin":
-        os.system(f'open -R "{path}"')
-    else:
-        os.system(f'xdg-open "{os.path.dirname(path)}"')
+    """탐색기에서 파일 표시 (셸/cmd.exe 를 거치지 않음)"""
+    try:
+        if sys.platform.startswith("win"):
+            # ShellExecuteW 반환값 > 32 이면 성공
+            if ctypes.windll.shell32.ShellExecuteW(None, "open", "explorer.exe",
+                                                   f'/select,"{path}"', None, 1) > 32: return
+            subprocess.Popen(["explorer", f"/select,{path}"])
+        elif sys.platform == "darwin":
+            subprocess.Popen(["open", "-R", path])
+        else:
+            subprocess.Popen(["xdg-open", os.path.dirname(path)])
+    except OSError: pass
+
+if sys.platform.startswith("win"):
+    class _SHFILEOPSTRUCT(ctypes.Structure):
+        _fields_ = [
+            ('hwnd', wintypes.HWND), ('wFunc', wintypes.UINT),
+            ('pFrom', wintypes.LPCWSTR), ('pTo', wintypes.LPCWSTR),
+            ('fFlags', ctypes.c_uint), ('fAnyOperationsAborted', wintypes.BOOL),
+            ('hNameMappings', ctypes.c_void_p), ('lpszProgressTitle', wintypes.LPCWSTR)
+        ]
+    _SHFileOperationW = ctypes.windll.shell32.SHFileOperationW
+    _SHFileOperationW.argtypes = [ctypes.POINTER(_SHFILEOPSTRUCT)]
+    _SHFileOperationW.restype = ctypes.c_int
 
-def recycle_delete(path: str) -> bool:
-    """휴지통으로 삭제"""
+def recycle_delete_many(paths) -> bool:
+    """여러 파일을 휴지통으로 삭제 (Windows: SHFileOperationW 1회). 모두 성공 시 True"""
+    if not paths: return True
     try:
         if sys.platform.startswith("win"):
-            class SHFILEOPSTRUCT(ctypes.Structure):
-                _fields_ = [
-                    ('hwnd', wintypes.HWND), ('wFunc', wintypes.UINT),
-                    ('pFrom', wintypes.LPCWSTR), ('pTo', wintypes.LPCWSTR),
-                    ('fFlags', ctypes.c_uint), ('fAnyOperationsAborted', wintypes.BOOL),
-                    ('hNameMappings', ctypes.c_void_p), ('lpszProgressTitle', wintypes.LPCWSTR)
-                ]
-            shell = ctypes.windll.shell32
-            pFrom = normalize_path(path) + '\0\0'
-            op = SHFILEOPSTRUCT(0, 0x0003, pFrom, None, 0x0050, False, None, None)
-            res = shell.SHFileOperationW(ctypes.byref(op))
+            pFrom = '\0'.join(normalize_path(p) for p in paths) + '\0\0'
+            op = _SHFILEOPSTRUCT(0, 0x0003, pFrom, None, 0x0050, False, None, None)
+            res = _SHFileOperationW(ctypes.byref(op))
             return res == 0 and not op.fAnyOperationsAborted
         else:
-            os.remove(path)
-            return True
+            ok = True
+            for p in paths:
+                try: os.remove(p)
+                except OSError: ok = False
+            return ok
     except:
         return False
 
@@ -282,6 +549,24 @@ class TagChipsDelegate(QStyledItemDelegate):
     def __init__(self, color_resolver, parent=None):
         super().__init__(parent)
         self._color_resolver = color_resolver
+        self._cache = {}  # 태그 → (칩 너비, 배경색)
+        self._font_key = None
+    
+    def invalidate(self):
+        """태그 이름/색상 변경 시 칩 캐시 비우기"""
+        self._cache.clear()
+    
+    def _chip(self, t, fm, pad_h):
+        """태그 칩 (너비, 배경색) 조회 (캐시)"""
+        hit = self._cache.get(t)
+        if hit is None:
+            try:
+                bg = self._color_resolver(t)
+                if not isinstance(bg, QColor): bg = color_for_item(None, t)
+            except:
+                bg = color_for_item(None, t)
+            hit = self._cache[t] = (fm.horizontalAdvance(t) + pad_h * 2, bg)
+        return hit
     
     def paint(self, painter, option, index):
         if index.column() != 3:
@@ -304,22 +589,22 @@ class TagChipsDelegate(QStyledItemDelegate):
         painter.setPen(pen)
         
         fm = opt.fontMetrics
+        font_key = opt.font.key()
+        if font_key != self._font_key:  # 글꼴이 바뀌면 칩 너비 캐시 무효
+            self._cache.clear()
+            self._font_key = font_key
         x, y_center = opt.rect.x() + 6, opt.rect.y() + opt.rect.height() // 2
         pad_h, pad_v, spacing = 8, 4, 6
         max_x, hidden = opt.rect.right() - 6, 0
+        chip_h = fm.height() + pad_v * 2
         
         for t in tags:
-            chip_w = fm.horizontalAdvance(t) + pad_h * 2
-            chip_h = fm.height() + pad_v * 2
+            chip_w, bg = self._chip(t, fm, pad_h)
             if x + chip_w > max_x:
                 hidden += 1
                 break
             rect = QRectF(x, y_center - chip_h / 2, chip_w, chip_h)
-            try:
-                bg = self._color_resolver(t)
-                painter.setBrush(bg if isinstance(bg, QColor) else color_for_item(None, t))
-            except:
-                painter.setBrush(color_for_item(None, t))
+            painter.setBrush(bg)
             painter.drawRoundedRect(rect, 10, 10)
             painter.drawText(rect, Qt.AlignCenter, t)
             x += chip_w + spacing
@@ -327,7 +612,6 @@ class TagChipsDelegate(QStyledItemDelegate):
         if hidden > 0:
             more = f"+{hidden}"
             chip_w = fm.horizontalAdvance(more) + pad_h * 2
-            chip_h = fm.height() + pad_v * 2
             if x + chip_w <= max_x:
                 rect = QRectF(x, y_center - chip_h / 2, chip_w, chip_h)
                 painter.setBrush(QColor(229, 231, 235))
@@ -336,11 +620,161 @@ class TagChipsDelegate(QStyledItemDelegate):
         
         painter.restore()
 
+# ========================= 스캔 워커 =========================
+class ScanWorker(QObject):
+    """스캔 전용 QThread 에 상주하며 루트 색인/누락 정리 수행 (스레드별 SQLite 연결 사용)"""
+    scan_started = Signal(int)
+    progress_tick = Signal(int, int)
+    scan_finished = Signal()
+    
+    @Slot(list, bool)
+    def run(self, roots: list, skip_if_current: bool):
+        """roots 색인. skip_if_current 이면 (단일 루트) 디스크와 DB가 같을 때 건너뜀"""
+        try:
+            if skip_if_current:
+                fs_total, fs_max_m = DBManager.count_and_stats(roots[0], is_disk=True)
+                db_total, db_max_m = DBManager.count_and_stats(roots[0])
+                if fs_total == db_total and db_max_m >= fs_max_m: return
+                total = fs_total
+            else:
+                total = sum(DBManager.count_and_stats(r, is_disk=True)[0] for r in roots)
+            total = max(total, 1)
+            self.scan_started.emit(total)
+            
+            processed, next_tick, me = 0, PROGRESS_STEP, QThread.currentThread()
+            for root in roots:
+                DBManager.add_root(root)
+                buf = []
+                for chunk in _scan_file_batches(root):
+                    if me.isInterruptionRequested(): return  # 앱 종료 중
+                    buf.extend(chunk)
+                    if len(buf) >= SCAN_BATCH:
+                        DBManager.upsert_files_many(buf)
+                        buf = []
+                    processed += len(chunk)
+                    # 묶음은 디렉터리마다 작게 올 수 있으므로 PROGRESS_STEP 경계를 넘을 때만 알림
+                    if processed >= next_tick:
+                        next_tick = (processed // PROGRESS_STEP + 1) * PROGRESS_STEP
+                        self.progress_tick.emit(min(processed, total), total)
+                self.progress_tick.emit(min(processed, total), total)  # 루트 끝: 남은 진행분 반영
+                if buf: DBManager.upsert_files_many(buf)
+                DBManager.remove_missing_under(root)
+        finally:
+            self.scan_finished.emit()
+
+class FileQueryWorker(QObject):
+    """조회 전용 QThread 에 상주하며 파일 목록을 FETCH_BATCH 행씩 UI 로 흘려보냄
+    latest 는 UI 스레드가 갱신하는 최신 요청 번호 — 더 새 요청이 오면 남은 조회를 버림"""
+    rows_ready = Signal(int, list)  # (요청 번호, 행 묶음)
+    query_done = Signal(int)
+    
+    def __init__(self):
+        super().__init__()
+        self.latest = 0
+    
+    @Slot(int, str, list, bool, object)
+    def run(self, gen: int, search_text: str, tag_ids: list, only_tagged: bool, root_prefix):
+        if gen != self.latest: return  # 대기 중에 새 요청이 들어옴
+        for chunk in _batched(DBManager.iter_files(search_text, tag_ids, only_tagged, root_prefix), FETCH_BATCH):
+            if gen != self.latest: return
+            self.rows_ready.emit(gen, chunk)
+        self.query_done.emit(gen)
+
+# ========================= 파일 테이블 모델 =========================
+FILE_HEADERS = ["파일", "크기", "수정시각", "태그", "위치", "ID"]
+
+class FileTableModel(QAbstractTableModel):
+    """파일 목록 모델: 열별 리스트(SoA)에 원시 값만 두고, 보이는 셀만 data() 에서 포맷"""
+    
+    def __init__(self, color_resolver, parent=None):
+        super().__init__(parent)
+        self._color_resolver = color_resolver
+        self._ids, self._paths, self._sizes, self._mtimes, self._tags, self._first_tags = [], [], [], [], [], []
+    
+    def set_rows(self, rows):
+        """(id, path, size, mtime, tags, first_tag) 행들로 모델 전체 교체"""
+        self.beginResetModel()
+        cols = [], [], [], [], [], []
+        appends = [c.append for c in cols]
+        for row in rows:
+            for append, v in zip(appends, row):
+                append(v)
+        self._ids, self._paths, self._sizes, self._mtimes, self._tags, self._first_tags = cols
+        self.endResetModel()
+    
+    def append_rows(self, rows):
+        """(id, path, size, mtime, tags, first_tag) 행들을 끝에 추가 (조회 결과 스트리밍용)"""
+        if not rows: return
+        n = len(self._ids)
+        self.beginInsertRows(QModelIndex(), n, n + len(rows) - 1)
+        for col, vals in zip((self._ids, self._paths, self._sizes, self._mtimes, self._tags, self._first_tags),
+                             zip(*rows)):
+            col.extend(vals)
+        self.endInsertRows()
+    
+    def iter_rows(self):
+        """현재 순서의 (id, path, size, mtime, tags, first_tag) 행 이터레이터"""
+        return zip(self._ids, self._paths, self._sizes, self._mtimes, self._tags, self._first_tags)
+    
+    def file_id(self, row: int) -> int:
+        return self._ids[row]
+    
+    def path(self, row: int) -> str:
+        return self._paths[row]
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(FILE_HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return FILE_HEADERS[section]
+        return super().headerData(section, orientation, role)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        r, c = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            if c == 0: return os.path.basename(self._paths[r])
+            if c == 1: return format_size_explorer(self._sizes[r])
+            if c == 2: return format_mtime(int(self._mtimes[r]))
+            if c == 3: return self._tags[r] or ""
+            if c == 4: return os.path.dirname(self._paths[r])
+            return str(self._ids[r])
+        if role == Qt.ToolTipRole and c in (0, 4):
+            return self._paths[r]
+        if role == Qt.TextAlignmentRole and c == 1:
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == Qt.BackgroundRole and c == 0 and self._first_tags[r]:  # 첫 태그 색상
+            return self._color_resolver(self._first_tags[r])
+        return None
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """원시 값(크기/수정시각 숫자 등)으로 정렬"""
+        keys = (
+            [os.path.basename(p) for p in self._paths], self._sizes, self._mtimes,
+            [t or "" for t in self._tags], [os.path.dirname(p) for p in self._paths], self._ids
+        )[column]
+        self.layoutAboutToBeChanged.emit()
+        perm = sorted(range(len(keys)), key=keys.__getitem__, reverse=(order == Qt.DescendingOrder))
+        for name in ("_ids", "_paths", "_sizes", "_mtimes", "_tags", "_first_tags"):
+            col = getattr(self, name)
+            setattr(self, name, [col[i] for i in perm])
+        # 선택 등 영구 인덱스를 새 행 위치로 옮김
+        new_row = {old: new for new, old in enumerate(perm)}
+        old_idx = self.persistentIndexList()
+        self.changePersistentIndexList(
+            old_idx, [self.index(new_row[i.row()], i.column()) for i in old_idx])
+        self.layoutChanged.emit()
+
 # ========================= 메인 UI =========================
 class MainUI(QWidget):
     progress_tick = Signal(int, int)
     scan_started = Signal(int)
     scan_finished = Signal()
+    scan_requested = Signal(list, bool)  # (roots, skip_if_current) → ScanWorker.run (스캔 스레드)
+    files_requested = Signal(int, str, list, bool, object)  # → FileQueryWorker.run (조회 스레드)
     
     def __init__(self):
         super().__init__()
@@ -353,6 +787,13 @@ class MainUI(QWidget):
         self.selected_tag_ids = set()
         self.scan_running = False
         self.tag_color_by_name = {}
+        self._root_row_by_path = {}  # 루트 경로 → root_list 행 (선택 복원용)
+        self._tag_row_by_id = {}  # 태그 id → tag_list 행
+        self._saved_search_state = None  # DB 에 마지막으로 저장한 (검색어, 태그만 "0"/"1")
+        self._roots_state = self._tags_state = None  # 마지막으로 그린 루트/태그 패널 내용 (같으면 다시 그리지 않음)
+        self._rows_cache = None  # (필터 키, ASCII 소문자 검색어, [(행, ASCII 소문자 경로), ...]) — 검색어 이어 치기용
+        self._files_gen = 0  # 최신 파일 목록 조회 요청 번호
+        self._files_pending = None  # 조회 중인 (필터 키, 소문자 검색어, 첫 묶음 전인지)
         
         self._setup_ui()
         self._connect_signals()
@@ -550,15 +991,19 @@ class MainUI(QWidget):
     
     def _create_table(self):
         """파일 테이블 생성"""
-        table = QTableWidget(0, 6)
+        # 미리 만든 태그 색상 dict 적중 시 color_for_item 호출 자체를 건너뜀
+        color_resolver = lambda name: self.tag_color_by_name.get(name) or color_for_item(None, name)
+        self.file_model = FileTableModel(color_resolver, self)
+        table = QTableView()
         table.setObjectName("fileTable")
-        table.setHorizontalHeaderLabels(["파일", "크기", "수정시각", "태그", "위치", "ID"])
+        table.setModel(self.file_model)
         table.setColumnHidden(5, True)
         table.setSelectionBehavior(QAbstractItemView.SelectRows)
         table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         table.setAlternatingRowColors(True)
+        table.horizontalHeader().setSortIndicator(2, Qt.DescendingOrder)
         table.setSortingEnabled(True)
         table.setShowGrid(True)
         
@@ -578,8 +1023,7 @@ class MainUI(QWidget):
         table.verticalHeader().setObjectName("fileTableV")
         
         # 태그 칩 델리게이트
-        self.tag_delegate = TagChipsDelegate(
-            lambda name: self.tag_color_by_name.get(name, color_for_item(None, name)), table)
+        self.tag_delegate = TagChipsDelegate(color_resolver, table)
         table.setItemDelegateForColumn(3, self.tag_delegate)
         
         return table
@@ -588,7 +1032,7 @@ class MainUI(QWidget):
         """스타일시트 적용"""
         self.setStyleSheet("""
         QWidget {background:#F3F4F6; color:#111827; font-size:12pt; font-weight:800;}
-        QLineEdit, QComboBox, QListWidget, QTableWidget {
+        QLineEdit, QComboBox, QListWidget, QTableView {
             background:#FFFFFF; color:#111827; border:1px solid #000000; border-radius:10px; font-weight:800;}
         QLineEdit:focus, QComboBox:focus {border:2px solid #000000; background:#FFFFFF;}
         #fileTable {font-size:10pt; border-radius:10px; gridline-color:#FFFFFF;}
@@ -596,8 +1040,8 @@ class MainUI(QWidget):
             background:#111827; color:#ffffff; padding:2px 8px; border:0; font-weight:900; font-size:12pt;
             border-right:1px solid rgba(255,255,255,0.06);}
         QHeaderView::section:last {border-right:0;}
-        QTableWidget {alternate-background-color:#F7F7F8;}
-        QTableWidget::item:selected, QListWidget::item:selected {background:#FDE68A; color:#111111;}
+        QTableView {alternate-background-color:#F7F7F8;}
+        QTableView::item:selected, QListWidget::item:selected {background:#FDE68A; color:#111111;}
         QHeaderView#fileTableH::section {
             background:#111827; color:#ffffff; padding:2px 8px; border:0; border-right:2px solid #F59E0B;}
         QHeaderView#fileTableH::section:last {border-right:0;}
@@ -627,8 +1071,8 @@ class MainUI(QWidget):
         QScrollBar::handle:horizontal {background:#3D3D3D; border-radius:6px; min-width:32px;}
         QScrollBar::handle:horizontal:hover {background:#505050;}
         QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {width:0;}
-        QTableWidget#fileTable::item:hover {background:#DC2626; color:#FFFFFF;}
-        QTableWidget#fileTable::item:selected:hover {background:#DC2626; color:#FFFFFF;}
+        QTableView#fileTable::item:hover {background:#DC2626; color:#FFFFFF;}
+        QTableView#fileTable::item:selected:hover {background:#DC2626; color:#FFFFFF;}
         """)
     
     def _connect_signals(self):
@@ -653,11 +1097,16 @@ class MainUI(QWidget):
         self.btn_search.clicked.connect(self.refresh_files_and_save)
         self.search.returnPressed.connect(self.refresh_files_and_save)
         self.chk_only_tagged.stateChanged.connect(self.on_only_tagged_toggled)
+        self._save_timer = QTimer(self)  # 검색 상태 저장 지연(연속 입력은 마지막 것만 저장)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(300)
+        self._save_timer.timeout.connect(self._save_search_state)
+        QApplication.instance().aboutToQuit.connect(self._save_search_state)
         
         # 테이블/파일
         self.root_list.itemClicked.connect(self.on_root_clicked)
-        self.table.itemSelectionChanged.connect(self.refresh_selected_file_tags)
-        self.table.itemDoubleClicked.connect(self.open_file)
+        self.table.selectionModel().selectionChanged.connect(lambda *_: self.refresh_selected_file_tags())
+        self.table.doubleClicked.connect(self.open_file)
         self.table.customContextMenuRequested.connect(self.on_table_context_menu)
         
         # 파일 태그
@@ -670,7 +1119,27 @@ class MainUI(QWidget):
         self.btn_external_evpn.clicked.connect(
             lambda: webbrowser.open("https://evpn.goe.go.kr/custom/index.html"))
         
-        # 진행 표시
+        # 스캔 스레드/진행 표시
+        self._scan_thread = QThread(self)
+        self._scan_worker = ScanWorker()
+        self._scan_worker.moveToThread(self._scan_thread)
+        self.scan_requested.connect(self._scan_worker.run)
+        self._scan_worker.scan_started.connect(self.scan_started)
+        self._scan_worker.progress_tick.connect(self.progress_tick)
+        self._scan_worker.scan_finished.connect(self.scan_finished)
+        self._scan_thread.start()
+        QApplication.instance().aboutToQuit.connect(self._stop_scan_thread)
+        
+        # 파일 목록 조회 스레드
+        self._query_thread = QThread(self)
+        self._query_worker = FileQueryWorker()
+        self._query_worker.moveToThread(self._query_thread)
+        self.files_requested.connect(self._query_worker.run)
+        self._query_worker.rows_ready.connect(self._on_file_rows)
+        self._query_worker.query_done.connect(self._on_files_done)
+        self._query_thread.start()
+        QApplication.instance().aboutToQuit.connect(self._stop_query_thread)
+        
         self.scan_started.connect(self._on_scan_started)
         self.progress_tick.connect(self._on_progress_tick)
         self.scan_finished.connect(self._on_scan_finished)
@@ -683,18 +1152,21 @@ class MainUI(QWidget):
         self.root_dir = self.db.get_setting("last_root", "") or None
         if self.root_dir:
             self.root_path_edit.setText(self.root_dir)
-        self.search.setText(self.db.get_setting("last_search", ""))
-        self.chk_only_tagged.setChecked(self.db.get_setting("last_only_tagged", "0") == "1")
+        last_search = self.db.get_setting("last_search", "")
+        last_only_tagged = self.db.get_setting("last_only_tagged", "0")
+        self._saved_search_state = (last_search, last_only_tagged)
+        self.search.setText(last_search)
+        self.chk_only_tagged.setChecked(last_only_tagged == "1")
         self.update_checkbox_style()
     
     def _initial_load(self):
         """초기 로드"""
-        self.refresh_roots_panel()
-        self.refresh_tags()
+        by_root, by_tag, total_cnt = self.db.dashboard_counts()
+        self.refresh_roots_panel(by_root)
+        self.refresh_tags(by_tag, total_cnt)
         self.refresh_files()
         
         # 자동 재스캔 또는 루트 선택
-        from PySide6.QtCore import QTimer
         if self._list_roots():
             QTimer.singleShot(0, self.rescan_all_roots)
         else:
@@ -707,28 +1179,16 @@ class MainUI(QWidget):
         cur = conn.cursor()
         cur.execute("SELECT path FROM roots ORDER BY path;")
         rows = [normalize_path(r[0]) for r in cur.fetchall()]
-        conn.close()
         return rows
     
-    def _add_root(self, path: str):
-        """루트 추가"""
-        path = normalize_path(path)
-        conn = self.db.get_conn()
-        cur = conn.cursor()
-        cur.execute("""INSERT INTO roots(path,last_scanned) VALUES(?,strftime('%s','now'))
-                       ON CONFLICT(path) DO UPDATE SET last_scanned=strftime('%s','now');""", (path,))
-        conn.commit()
-        conn.close()
-    
     def _remove_root(self, path: str):
         """루트 제거"""
+        _normalize_path_impl.cache_clear()
         path = normalize_path(path)
         conn = self.db.get_conn()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM roots WHERE path=?;", (path,))
-        cur.execute("DELETE FROM files WHERE path LIKE ?;", (f"{path}%",))
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute("DELETE FROM roots WHERE path=?;", (path,))
+            conn.execute("DELETE FROM files WHERE path LIKE ?;", (f"{path}%",))
     
     def _list_tags(self):
         """태그 목록"""
@@ -736,81 +1196,82 @@ class MainUI(QWidget):
         cur = conn.cursor()
         cur.execute("SELECT id, name, ord FROM tags ORDER BY ord ASC, name ASC;")
         rows = cur.fetchall()
-        conn.close()
         return rows
     
     def _delete_tags(self, tag_ids):
         """태그 삭제"""
         if not tag_ids: return
         conn = self.db.get_conn()
-        cur = conn.cursor()
-        cur.executemany("DELETE FROM tags WHERE id=?;", [(tid,) for tid in tag_ids])
-        conn.commit()
-        conn.close()
+        with conn:
+            for chunk in _batched(tag_ids, SQL_IN_CHUNK):
+                conn.execute(f"DELETE FROM tags WHERE id IN ({','.join('?' * len(chunk))});", chunk)
     
     def _count_files_by_tag(self):
         """태그별 파일 개수"""
         conn = self.db.get_conn()
         cur = conn.cursor()
-        cur.execute("""
-            SELECT t.id, COALESCE(COUNT(ft.file_id),0) AS cnt
-            FROM tags t LEFT JOIN file_tags ft ON ft.tag_id=t.id
-            GROUP BY t.id ORDER BY t.ord, t.name;
-        """)
+        cur.execute(SQL_COUNT_FILES_BY_TAG)
         rows = cur.fetchall()
-        conn.close()
         return {tid: cnt for tid, cnt in rows}
     
     def _list_file_tags(self, file_id: int):
         """파일의 태그 목록"""
         conn = self.db.get_conn()
         cur = conn.cursor()
-        cur.execute("""
-            SELECT t.id, t.name FROM tags t
-            JOIN file_tags ft ON ft.tag_id=t.id
-            WHERE ft.file_id=? ORDER BY t.ord, t.name;""", (file_id,))
+        cur.execute(SQL_LIST_FILE_TAGS, (file_id,))
         rows = cur.fetchall()
-        conn.close()
         return rows
     
     # ==================== UI 업데이트 ====================
-    def refresh_roots_panel(self):
-        """루트 패널 새로고침"""
+    def refresh_roots_panel(self, counts=None):
+        """루트 패널 새로고침 (counts: 미리 조회한 counts_by_root() 결과, 내용이 같으면 다시 만들지 않음)"""
+        if counts is None: counts = self.db.counts_by_root()
+        state = tuple(sorted((r, c) for r, (c, _m) in counts.items()))
+        if state == self._roots_state: return
+        self._roots_state = state
         self.root_list.clear()
         all_item = QListWidgetItem("전체 경로 보기")
         all_item.setData(Qt.UserRole, None)
         all_item.setToolTip("등록된 모든 경로 합산 보기")
         self.root_list.addItem(all_item)
         
-        for root in sorted(set(self._list_roots()), key=str.lower):
-            cnt, _ = self.db.count_and_stats(root)
+        self._root_row_by_path = {}
+        for root in sorted(counts, key=str.lower):
+            cnt, _ = counts[root]
             it = QListWidgetItem(f"{root} ({cnt:,})")
             it.setData(Qt.UserRole, root)
             it.setBackground(QBrush(color_for_item(root)))
             it.setToolTip(root)
+            self._root_row_by_path[root] = self.root_list.count()
             self.root_list.addItem(it)
     
-    def refresh_tags(self):
-        """태그 패널 새로고침"""
+    def refresh_tags(self, by_tag=None, total_cnt=None):
+        """태그 패널 새로고침 (by_tag/total_cnt: 미리 조회한 개수, 내용이 같으면 다시 만들지 않음)"""
+        if total_cnt is None: total_cnt, _ = self.db.count_and_stats()
+        if by_tag is None: by_tag = self._count_files_by_tag()
+        tags = self._list_tags()
+        state = (total_cnt, tuple(tags), tuple(sorted(by_tag.items())))
+        if state == self._tags_state: return
+        self._tags_state = state
         self.tag_list.clear()
-        total_cnt, _ = self.db.count_and_stats()
         
         self.tag_color_by_name = {}
+        self._tag_row_by_id = {}
         
         all_item = QListWidgetItem(f"전체 파일 ({total_cnt:,})")
         all_item.setData(Qt.UserRole, None)
         all_item.setBackground(QBrush(QColor(235, 235, 235)))
         self.tag_list.addItem(all_item)
         
-        by_tag = self._count_files_by_tag()
         self.combo_tag.clear()
         
-        for tid, name, _ord in self._list_tags():
+        for tid, name, _ord in tags:
             cnt = by_tag.get(tid, 0)
             it = QListWidgetItem(f"{name} ({cnt:,})")
             it.setData(Qt.UserRole, tid)
             col = color_for_item(tid, name)
             it.setBackground(QBrush(col))
+            self._tag_row_by_id[tid] = self.tag_list.count()
             self.tag_list.addItem(it)
             
             self.combo_tag.addItem(name, userData=tid)
@@ -819,83 +1280,92 @@ class MainUI(QWidget):
             
             self.tag_color_by_name[name] = col
         
+        self.tag_delegate.invalidate()
         self.tag_list.setCurrentRow(0)
     
     def refresh_files(self):
         """파일 목록 새로고침"""
-        self.table.setSortingEnabled(False)
-        self.table.setRowCount(0)
-        
-        rows = self.db.list_files(
-            self.search.text().strip(),
-            list(self.selected_tag_ids),
-            self.chk_only_tagged.isChecked(),
-            self.root_filter
-        )
-        self.count_lbl.setText(f"결과: {len(rows):,}건")
-        
-        for fid, path, size, mtime, tag_text in rows:
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-            
-            fname = os.path.basename(path)
-            fdir = os.path.dirname(path)
-            
-            it_file = QTableWidgetItem(fname)
-            it_file.setData(Qt.UserRole, path)
-            it_file.setToolTip(path)
-            
-            it_size = QTableWidgetItem(format_size_explorer(size))
-            it_size.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            
-            it_mtim = QTableWidgetItem(datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S"))
-            it_tags = QTableWidgetItem(tag_text or "")
-            it_dir = QTableWidgetItem(fdir)
-            it_dir.setToolTip(path)
-            it_id = QTableWidgetItem(str(fid))
-            
-            # 첫 태그 색상 적용
-            if tag_text:
-                first_tag = (tag_text.split(",")[0] or "").strip()
-                if first_tag:
-                    col = self.tag_color_by_name.get(first_tag, color_for_item(None, first_tag))
-                    it_file.setBackground(QBrush(col))
-            
-            self.table.setItem(r, 0, it_file)
-            self.table.setItem(r, 1, it_size)
-            self.table.setItem(r, 2, it_mtim)
-            self.table.setItem(r, 3, it_tags)
-            self.table.setItem(r, 4, it_dir)
-            self.table.setItem(r, 5, it_id)
+        search_text = self.search.text().strip()
+        needle = _like_fold(search_text)
+        key = (tuple(sorted(self.selected_tag_ids)), self.chk_only_tagged.isChecked(), self.root_filter)
+        self._files_gen += 1
+        self._query_worker.latest = self._files_gen  # 진행 중인 이전 조회는 중단
+        cache = self._rows_cache
+        # 비ASCII 검색어는 FTS(유니코드 대소문자 무시)와 LIKE(ASCII 만) 결과가 달라 항상 DB 로 조회
+        if cache and needle.isascii() and cache[0] == key and needle.startswith(cache[1]):
+            # 직전 결과를 좁히는 검색이면 DB 대신 메모리에서 부분문자열로 거름
+            self._files_pending = None
+            pairs = [(row, low) for row, low in cache[2] if needle in low]
+            self.file_model.set_rows(row for row, _low in pairs)
+            self._finish_refresh_files(key, needle, pairs)
+        else:
+            # 조회 스레드에서 FETCH_BATCH 행씩 받아 모델에 이어 붙임 (UI 는 멈추지 않음)
+            self._files_pending = (key, needle, True)
+            self.count_lbl.setText("조회 중…")
+            self.files_requested.emit(self._files_gen, search_text, list(key[0]), key[1], key[2])
+    
+    def _on_file_rows(self, gen: int, rows: list):
+        """조회 스레드가 보낸 행 묶음을 모델에 반영 (첫 묶음이면 목록 교체)"""
+        if gen != self._files_gen or self._files_pending is None: return
+        key, needle, first = self._files_pending
+        if first:
+            self.file_model.set_rows(rows)
+            self._files_pending = (key, needle, False)
+        else:
+            self.file_model.append_rows(rows)
+        self.count_lbl.setText(f"결과: {self.file_model.rowCount():,}건 (조회 중…)")
+    
+    def _on_files_done(self, gen: int):
+        """파일 목록 조회 완료"""
+        if gen != self._files_gen or self._files_pending is None: return
+        key, needle, first = self._files_pending
+        self._files_pending = None
+        if first: self.file_model.set_rows([])  # 결과 없음
+        self._finish_refresh_files(key, needle, None)
+    
+    def _finish_refresh_files(self, key, needle, pairs):
+        """검색어 이어 치기 캐시 갱신, 개수 표시, 기본 정렬"""
+        n = self.file_model.rowCount()
+        if n > REFINE_CACHE_MAX:
+            self._rows_cache = None
+        else:
+            if pairs is None:
+                pairs = [(row, _like_fold(row[1])) for row in self.file_model.iter_rows()]
+            self._rows_cache = (key, needle, pairs)
         
-        self.table.setSortingEnabled(True)
-        self.table.sortItems(2, Qt.DescendingOrder)
+        self.count_lbl.setText(f"결과: {n:,}건")
+        self.table.sortByColumn(2, Qt.DescendingOrder)
+        self.refresh_selected_file_tags()
     
     def refresh_all_counts(self):
         """전체 카운트 새로고침"""
+        self._rows_cache = None  # 파일/태그가 바뀌었으므로 검색 결과 캐시 무효
         cur_item = self.root_list.currentItem()
         cur_path = cur_item.data(Qt.UserRole) if cur_item else None
         vpos = self.root_list.verticalScrollBar().value()
         
-        self.refresh_roots_panel()
+        by_root, by_tag, total_cnt = self.db.dashboard_counts()
+        self.refresh_roots_panel(by_root)
         
-        if cur_path is None:
-            self.root_list.setCurrentRow(0)
-        else:
-            for i in range(self.root_list.count()):
-                if self.root_list.item(i).data(Qt.UserRole) == cur_path:
-                    self.root_list.setCurrentRow(i)
-                    break
+        row = self._root_row_by_path.get(cur_path, 0 if cur_path is None else None)
+        if row is not None: self.root_list.setCurrentRow(row)
         
         self.root_list.verticalScrollBar().setValue(vpos)
-        self.refresh_tags()
+        self.refresh_tags(by_tag, total_cnt)
         self.refresh_files()
     
     def refresh_files_and_save(self):
-        """검색어 저장 후 새로고침"""
-        self.db.set_setting("last_search", self.search.text().strip())
-        self.db.set_setting("last_only_tagged", "1" if self.chk_only_tagged.isChecked() else "0")
+        """새로고침 후 검색 상태 저장 예약"""
         self.refresh_files()
+        self._save_timer.start()
+    
+    def _save_search_state(self):
+        """검색어/태그 필터 저장 (마지막 저장값과 같으면 건너뜀)"""
+        self._save_timer.stop()
+        state = (self.search.text().strip(), "1" if self.chk_only_tagged.isChecked() else "0")
+        if state == self._saved_search_state: return
+        self.db.set_settings([("last_search", state[0]), ("last_only_tagged", state[1])])
+        self._saved_search_state = state
     
     # ==================== 이벤트 핸들러 ====================
     def on_tag_clicked(self, item: QListWidgetItem):
@@ -924,7 +1394,7 @@ class MainUI(QWidget):
     
     def on_table_context_menu(self, pos):
         """테이블 컨텍스트 메뉴"""
-        if not self.table.itemAt(pos):
+        if not self.table.indexAt(pos).isValid():
             return
         
         menu = QMenu(self)
@@ -949,11 +1419,11 @@ class MainUI(QWidget):
         elif act == act_delete:
             self.delete_selected_files()
     
-    def open_file(self, item):
+    def open_file(self, index):
         """파일 열기"""
-        if item.column() != 0:
+        if index.column() != 0:
             return
-        full_path = item.data(Qt.UserRole)
+        full_path = self.file_model.path(index.row())
         if full_path:
             self._open_path(full_path)
     
@@ -982,6 +1452,18 @@ class MainUI(QWidget):
         self.progress.setValue(processed)
         self.count_lbl.setText(f"색인 중… ({processed:,} / {total:,})")
     
+    def _stop_query_thread(self):
+        """앱 종료 시 진행 중인 파일 목록 조회를 버리고 조회 스레드 정리"""
+        self._query_worker.latest = -1
+        self._query_thread.quit()
+        self._query_thread.wait()
+    
+    def _stop_scan_thread(self):
+        """앱 종료 시 진행 중인 스캔을 중단하고 스캔 스레드 정리"""
+        self._scan_thread.requestInterruption()
+        self._scan_thread.quit()
+        self._scan_thread.wait()
+    
     def _on_scan_finished(self):
         """스캔 완료"""
         self.scan_running = False
@@ -1028,36 +1510,26 @@ class MainUI(QWidget):
         if tid is None:
             return
         
+        # 현재 태그와 이웃 태그(위/아래)의 ord 를 한 번에 조회
+        nb_sql = ("SELECT id FROM tags WHERE ord<t.ord ORDER BY ord DESC LIMIT 1" if delta < 0 else
+                  "SELECT id FROM tags WHERE ord>t.ord ORDER BY ord ASC LIMIT 1")
         conn = self.db.get_conn()
         c = conn.cursor()
-        c.execute("SELECT ord FROM tags WHERE id=?;", (tid,))
+        c.execute(f"""SELECT t.ord, nb.id, nb.ord FROM tags t
+                      JOIN tags nb ON nb.id=({nb_sql}) WHERE t.id=?;""", (tid,))
         row = c.fetchone()
         if not row:
-            conn.close()
             return
         
-        cur_ord = row[0]
-        if delta < 0:
-            c.execute("SELECT id, ord FROM tags WHERE ord<? ORDER BY ord DESC LIMIT 1;", (cur_ord,))
-        else:
-            c.execute("SELECT id, ord FROM tags WHERE ord>? ORDER BY ord ASC LIMIT 1;", (cur_ord,))
-        
-        nb = c.fetchone()
-        if not nb:
-            conn.close()
-            return
-        
-        nb_id, nb_ord = nb
-        c.execute("UPDATE tags SET ord=? WHERE id=?;", (nb_ord, tid))
-        c.execute("UPDATE tags SET ord=? WHERE id=?;", (cur_ord, nb_id))
-        conn.commit()
-        conn.close()
+        cur_ord, nb_id, nb_ord = row
+        with conn:
+            c.execute("UPDATE tags SET ord = CASE id WHEN ? THEN ? WHEN ? THEN ? END WHERE id IN (?,?);",
+                      (tid, nb_ord, nb_id, cur_ord, tid, nb_id))
         
+        self._rows_cache = None  # 태그 문자열 순서가 바뀔 수 있음
         self.refresh_tags()
-        for i in range(self.tag_list.count()):
-            if self.tag_list.item(i).data(Qt.UserRole) == tid:
-                self.tag_list.setCurrentRow(i)
-                break
+        row = self._tag_row_by_id.get(tid)
+        if row is not None: self.tag_list.setCurrentRow(row)
     
     def rename_selected_tag(self):
         """선택 태그 이름 변경"""
@@ -1098,26 +1570,22 @@ class MainUI(QWidget):
         if row:
             new_tid = row[0]
             if new_tid == old_tid:
-                conn.close()
                 return
             
             # 병합
-            c.execute("INSERT OR IGNORE INTO file_tags(file_id, tag_id) "
-                      "SELECT file_id, ? FROM file_tags WHERE tag_id=?;", (new_tid, old_tid))
-            c.execute("DELETE FROM file_tags WHERE tag_id=?;", (old_tid,))
-            c.execute("DELETE FROM tags WHERE id=?;", (old_tid,))
-            conn.commit()
-            conn.close()
+            with conn:
+                c.execute("INSERT OR IGNORE INTO file_tags(file_id, tag_id) "
+                          "SELECT file_id, ? FROM file_tags WHERE tag_id=?;", (new_tid, old_tid))
+                c.execute("DELETE FROM file_tags WHERE tag_id=?;", (old_tid,))
+                c.execute("DELETE FROM tags WHERE id=?;", (old_tid,))
             QMessageBox.information(self, "안내", f"동일 이름이 있어 태그를 병합했습니다: {new_name}")
         else:
             try:
-                c.execute("UPDATE tags SET name=? WHERE id=?;", (new_name, old_tid))
-                conn.commit()
+                with conn:
+                    c.execute("UPDATE tags SET name=? WHERE id=?;", (new_name, old_tid))
             except sqlite3.IntegrityError:
-                conn.close()
                 QMessageBox.warning(self, "오류", "태그 이름이 중복되어 변경할 수 없습니다.")
                 return
-            conn.close()
         
         self.refresh_all_counts()
     
@@ -1148,13 +1616,7 @@ class MainUI(QWidget):
             QMessageBox.information(self, "안내", "파일을 먼저 선택하세요.")
             return
         
-        conn = self.db.get_conn()
-        cur = conn.cursor()
-        for fid in ids:
-            cur.execute("INSERT OR IGNORE INTO file_tags(file_id, tag_id) VALUES(?, ?);", (fid, tid))
-        conn.commit()
-        conn.close()
-        
+        self.db.assign_tags_many(ids, [tid])
         self.refresh_all_counts()
     
     def untag_selected_from_selected_files(self):
@@ -1170,12 +1632,10 @@ class MainUI(QWidget):
             return
         
         conn = self.db.get_conn()
-        cur = conn.cursor()
-        for it in selected:
-            cur.execute("DELETE FROM file_tags WHERE file_id=? AND tag_id=?;",
-                       (fid, it.data(Qt.UserRole)))
-        conn.commit()
-        conn.close()
+        with conn:
+            for chunk in _batched((it.data(Qt.UserRole) for it in selected), SQL_IN_CHUNK):
+                conn.execute("DELETE FROM file_tags WHERE file_id=? AND tag_id IN "
+                             f"({','.join('?' * len(chunk))});", [fid, *chunk])
         
         self.refresh_all_counts()
     
@@ -1202,11 +1662,9 @@ class MainUI(QWidget):
         
         # DB 업데이트
         conn = self.db.get_conn()
-        cur = conn.cursor()
-        cur.execute("UPDATE files SET path=? WHERE path=?;",
-                    (normalize_path(new_path), normalize_path(old)))
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute("UPDATE files SET path=? WHERE path=?;",
+                         (normalize_path(new_path), normalize_path(old)))
         
         self.refresh_all_counts()
     
@@ -1221,13 +1679,12 @@ class MainUI(QWidget):
                 != QMessageBox.StandardButton.Yes:
             return
         
+        # 일부만 지워졌을 수 있으므로 실제로 사라진 파일만 DB에서 제거
+        done = ps if recycle_delete_many(ps) else [p for p in ps if not os.path.lexists(p)]
         conn = self.db.get_conn()
-        cur = conn.cursor()
-        for p in ps:
-            if recycle_delete(p):
-                cur.execute("DELETE FROM files WHERE path=?;", (normalize_path(p),))
-        conn.commit()
-        conn.close()
+        with conn:
+            for chunk in _batched((normalize_path(p) for p in done), SQL_IN_CHUNK):
+                conn.execute(f"DELETE FROM files WHERE path IN ({','.join('?' * len(chunk))});", chunk)
         
         self.refresh_all_counts()
     
@@ -1242,7 +1699,7 @@ class MainUI(QWidget):
             self.root_dir = normalize_path(d)
             self.root_path_edit.setText(self.root_dir)
             self.db.set_setting("last_root", self.root_dir)
-            self._add_root(self.root_dir)
+            self.db.add_root(self.root_dir)
             self.refresh_roots_panel()
             self.root_filter = None
             self.root_list.setCurrentRow(0)
@@ -1265,37 +1722,7 @@ class MainUI(QWidget):
             return
         
         self.scan_running = True
-        root = normalize_path(root)
-        
-        fs_total, fs_max_m = self.db.count_and_stats(root, is_disk=True)
-        db_total, db_max_m = self.db.count_and_stats(root)
-        
-        if fs_total == db_total and (db_max_m >= fs_max_m):
-            self.scan_finished.emit()
-            return
-        
-        self.scan_started.emit(fs_total)
-        step = max(1, fs_total // 100)
-        
-        def worker():
-            processed = 0
-            try:
-                self._add_root(root)
-                for dp, _, files in os.walk(root):
-                    for fn in files:
-                        full = os.path.join(dp, fn)
-                        try:
-                            self.db.upsert_file(full)
-                        except:
-                            pass
-                        processed += 1
-                        if (processed % step == 0) or (processed == fs_total):
-                            self.progress_tick.emit(processed, fs_total)
-                self.db.remove_missing_under(root)
-            finally:
-                self.scan_finished.emit()
-        
-        threading.Thread(target=worker, daemon=True).start()
+        self.scan_requested.emit([normalize_path(root)], True)
     
     def rescan_selected_root(self):
         """선택 루트 재스캔"""
@@ -1322,32 +1749,8 @@ class MainUI(QWidget):
             QMessageBox.information(self, "안내", "재스캔할 경로가 없습니다.")
             return
         
-        uniq = list(set(roots))
-        total = sum(self.db.count_and_stats(r, is_disk=True)[0] for r in uniq)
-        
         self.scan_running = True
-        self.scan_started.emit(total if total > 0 else 1)
-        
-        def worker():
-            processed = 0
-            try:
-                for root in uniq:
-                    self._add_root(root)
-                    for dp, _, files in os.walk(root):
-                        for fn in files:
-                            full = os.path.join(dp, fn)
-                            try:
-                                self.db.upsert_file(full)
-                            except:
-                                pass
-                            processed += 1
-                            if processed % 500 == 0 or processed == total:
-                                self.progress_tick.emit(processed, total if total > 0 else 1)
-                    self.db.remove_missing_under(root)
-            finally:
-                self.scan_finished.emit()
-        
-        threading.Thread(target=worker, daemon=True).start()
+        self.scan_requested.emit(list(set(roots)), False)
     
     def remove_selected_root(self):
         """선택 루트 제거"""
@@ -1367,6 +1770,7 @@ class MainUI(QWidget):
             return
         
         self._remove_root(root)
+        self._rows_cache = None
         
         if self.root_filter == root:
             self.root_filter = None
@@ -1390,25 +1794,18 @@ class MainUI(QWidget):
     
     def _selected_file_ids(self):
         """선택된 파일 ID 목록"""
-        ids = []
-        if self.table.selectionModel():
-            for idx in self.table.selectionModel().selectedRows():
-                ids.append(int(self.table.item(idx.row(), 5).text()))
-        return ids
+        return [self.file_model.file_id(idx.row())
+                for idx in self.table.selectionModel().selectedRows()]
     
     def _get_selected_paths(self):
         """선택된 파일 경로 목록"""
-        paths = []
-        if self.table.selectionModel():
-            for idx in self.table.selectionModel().selectedRows():
-                p = self.table.item(idx.row(), 0).data(Qt.UserRole)
-                if p:
-                    paths.append(p)
-        return paths
+        return [self.file_model.path(idx.row())
+                for idx in self.table.selectionModel().selectedRows()]
 
 # ========================= 엔트리포인트 =========================
 def main():
     DBManager.init_db()
+    atexit.register(DBManager.close_conn)
     app = QApplication(sys.argv)
     ui = MainUI()
     ui.show()
@@ -0,0 +1,25 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+_SPEC = importlib.util.spec_from_file_location(
+    "tagfile_c", Path(__file__).resolve().parent.parent / "tagfile-c.py")
+tagfile_c = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(tagfile_c)
+
+
+@pytest.fixture
+def tf():
+    return tagfile_c
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(tagfile_c, "DB_PATH", str(tmp_path / "filetags.db"))
+    tagfile_c.DBManager.close_conn()
+    tagfile_c.DBManager.init_db()
+    yield tagfile_c.DBManager
+    tagfile_c.DBManager.close_conn()
@@ -0,0 +1,45 @@
+import pytest
+
+
+def _seed(tf, db, root, names):
+    root.mkdir()
+    for name in names:
+        (root / name).write_text(name)
+    db.add_root(str(root))
+    db.upsert_files_many([(tf.normalize_path(str(p)), p.stat().st_size, p.stat().st_mtime)
+                          for p in root.iterdir()])
+
+
+def test_counts_by_root_does_not_count_sibling_root_with_shared_prefix(tf, db, tmp_path):
+    data, data2 = tmp_path / "data", tmp_path / "data2"
+    _seed(tf, db, data, ["a.txt"])
+    _seed(tf, db, data2, ["b.txt", "c.txt"])
+
+    counts = db.counts_by_root()
+
+    assert counts[tf.normalize_path(str(data))][0] == 1
+    assert counts[tf.normalize_path(str(data2))][0] == 2
+
+
+def test_dashboard_counts_inside_open_transaction(tf, db, tmp_path):
+    _seed(tf, db, tmp_path / "data", ["a.txt", "b.txt"])
+    conn = db.get_conn()
+    conn.execute("BEGIN;")
+    try:
+        by_root, _by_tag, total = db.dashboard_counts()
+        assert conn.in_transaction
+    finally:
+        conn.rollback()
+    assert total == 2
+    assert list(by_root.values())[0][0] == 2
+    assert not conn.in_transaction
+
+
+def test_dashboard_counts_rolls_back_and_reraises(tf, db, monkeypatch):
+    def boom():
+        raise RuntimeError("boom")
+    monkeypatch.setattr(db, "counts_by_root", boom)
+    conn = db.get_conn()
+    with pytest.raises(RuntimeError, match="boom"):
+        db.dashboard_counts()
+    assert not conn.in_transaction
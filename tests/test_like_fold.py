@@ -0,0 +1,18 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.mark.parametrize("path, needle", [
+    ("C:/Docs/Report.TXT", "report"),
+    ("/tmp/ÉCOLE/a.txt", "école"),
+    ("/tmp/école/a.txt", "ÉCOLE"),
+    ("/tmp/Kelvin/\u212a.txt", "k.txt"),
+    ("/tmp/İstanbul.txt", "i"),
+    ("/tmp/ß.txt", "SS"),
+])
+def test_like_fold_matches_sqlite_like(tf, path, needle):
+    conn = sqlite3.connect(":memory:")
+    like = conn.execute("SELECT ? LIKE ? ESCAPE '\\'",
+                        (path, f"%{tf._like_escape(needle)}%")).fetchone()[0]
+    assert (tf._like_fold(needle) in tf._like_fold(path)) == bool(like)
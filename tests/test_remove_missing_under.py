@@ -0,0 +1,35 @@
+import os
+
+
+def test_remove_missing_under_keeps_sibling_root_with_shared_prefix(tf, db, tmp_path):
+    data, data2 = tmp_path / "data", tmp_path / "data2"
+    data.mkdir()
+    data2.mkdir()
+    (data / "a.txt").write_text("a")
+    (data2 / "b.txt").write_text("b")
+    for root in (data, data2):
+        db.add_root(str(root))
+        db.upsert_files_many([(tf.normalize_path(str(p)), p.stat().st_size, p.stat().st_mtime)
+                              for p in root.iterdir()])
+    fid = db.list_files("b.txt", [], False)[0][0]
+    db.assign_tags_many([fid], [db.ensure_tag("keep")])
+
+    assert db.remove_missing_under(str(data)) == 0
+
+    paths = [row[1] for row in db.list_files("", [], False)]
+    assert tf.normalize_path(str(data2 / "b.txt")) in paths
+    assert db.list_files("", [db.ensure_tag("keep")], False)[0][0] == fid
+
+
+def test_remove_missing_under_removes_deleted_file(tf, db, tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.txt").write_text("a")
+    (data / "gone.txt").write_text("x")
+    db.add_root(str(data))
+    db.upsert_files_many([(tf.normalize_path(str(p)), p.stat().st_size, p.stat().st_mtime)
+                          for p in data.iterdir()])
+    (data / "gone.txt").unlink()
+
+    assert db.remove_missing_under(str(data)) == 1
+    assert [os.path.basename(row[1]) for row in db.list_files("", [], False)] == ["a.txt"]
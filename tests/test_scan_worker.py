@@ -0,0 +1,16 @@
+def test_progress_tick_is_throttled_to_progress_step(tf, db, tmp_path):
+    root = tmp_path / "root"
+    n_dirs = 2500  # 디렉터리마다 파일 1개 → 묶음도 디렉터리마다 1행
+    for i in range(n_dirs):
+        d = root / f"d{i:04d}"
+        d.mkdir(parents=True)
+        (d / "f.txt").write_text("x")
+
+    worker = tf.ScanWorker()
+    ticks = []
+    worker.progress_tick.connect(lambda done, total: ticks.append((done, total)))
+    worker.run([str(root)], False)
+
+    assert ticks[-1] == (n_dirs, n_dirs)
+    assert len(ticks) <= n_dirs // tf.PROGRESS_STEP + 1
+    assert db.count_and_stats(str(root)) == (n_dirs, db.count_and_stats(str(root), is_disk=True)[1])